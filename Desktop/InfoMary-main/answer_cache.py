@@ -0,0 +1,146 @@
+"""
+Semantic answer cache for InfoMary's stateless branch (Healthcare Services / Medical Procedures)
+Those answers depend only on the fixed system prompt and the user message, so a new message whose
+embedding is close enough to a cached one can be answered without an LLM call.
+Bounded in-memory LRU, optionally persisted to SQLite.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+ANSWER_CACHE_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))
+# Path to a SQLite file to keep answers across restarts; empty disables persistence
+ANSWER_CACHE_DB = os.environ.get("ANSWER_CACHE_DB", "")
+
+
+def cache_namespace(*parts):
+    """Answers are only reusable for the same prompt/model - hash them into a namespace"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticAnswerCache:
+    """Cosine-similarity lookup over cached (query embedding, answer) pairs"""
+
+    def __init__(self, namespace="default", threshold=ANSWER_CACHE_THRESHOLD,
+                 max_size=ANSWER_CACHE_SIZE, db_path=ANSWER_CACHE_DB):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.max_size = max(1, max_size)
+        self._entries = OrderedDict()  # id -> (unit embedding, query, answer)
+        self._matrix = None
+        self._matrix_ids = []
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._open_db(db_path)
+
+    # ------------------------------------------------------------------
+    # SQLite persistence
+    # ------------------------------------------------------------------
+
+    def _open_db(self, db_path):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    id TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_ns_used ON answers (namespace, last_used)")
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT id, query, embedding, answer FROM answers WHERE namespace = ? ORDER BY last_used DESC LIMIT ?",
+                (self.namespace, self.max_size)
+            ).fetchall()
+            for entry_id, query, blob, answer in reversed(rows):
+                self._entries[entry_id] = (np.frombuffer(blob, dtype=np.float32), query, answer)
+            print(f"✅ Answer cache loaded {len(rows)} entries from {db_path}")
+        except sqlite3.Error as e:
+            print(f"⚠️ Answer cache persistence disabled: {e}")
+            self._db = None
+
+    def _db_write(self, sql, params):
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(sql, params)
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Answer cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _stacked(self):
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries)
+            self._matrix = (np.vstack([self._entries[i][0] for i in self._matrix_ids])
+                            if self._matrix_ids else None)
+        return self._matrix
+
+    def lookup(self, embedding):
+        """Return the cached answer for the most similar query above the threshold, else None"""
+        with self._lock:
+            matrix = self._stacked()
+            if matrix is None:
+                self.misses += 1
+                return None
+            scores = matrix @ self._unit(embedding)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            entry_id = self._matrix_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            answer = self._entries[entry_id][2]
+        self._db_write("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), entry_id))
+        return answer
+
+    def store(self, query, embedding, answer):
+        entry_id = uuid.uuid4().hex
+        vector = self._unit(embedding)
+        evicted = []
+        with self._lock:
+            self._entries[entry_id] = (vector, query, answer)
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self._matrix = None
+        self._db_write(
+            "INSERT INTO answers (id, namespace, query, embedding, answer, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (entry_id, self.namespace, query, vector.tobytes(), answer, time.time())
+        )
+        for old_id in evicted:
+            self._db_write("DELETE FROM answers WHERE id = ?", (old_id,))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,32 +1,68 @@
 from dotenv import load_dotenv
 import chainlit as cl
 import re
-from chromadb.config import Settings
-import chromadb
+import asyncio
+import json
 import numpy as np
-from langchain_huggingface import HuggingFaceEmbeddings
-from collections import OrderedDict
 from typing import Dict, Optional
-import requests
-import json
 import os
-import uuid
 import openai
+from embeddings import get_engine, get_batcher
+from fireworks_client import FireworksError, get_fireworks_client
+from streaming import LineDeduplicator, StreamStats, TokenCoalescer, iter_sse_deltas, replay_text
+from answer_cache import SemanticAnswerCache, cache_namespace
+from retrieval_cache import RetrievalCache
+from vector_index import get_backend, search_partitioned
+from categories import DEFAULT_CATEGORY, normalize_category
+from pipeline import TurnTimer, cancel_tasks
+from classifier import LocalRequestClassifier
+from tts_pipeline import TTS_PIPELINE, SpeechPipeline
+from tts_cache import TTSCache
+from speech_input import FFMPEG_PATH, StreamingTranscription, get_transcriber
+from conversation_context import CONTEXT_SUMMARY_TOKENS, ConversationContext
+from transcript import Transcript
 
 load_dotenv()
-db = chromadb.PersistentClient(path="./db", settings=Settings(allow_reset=True))
-collection_name = "MATZ_Health_Bot"
+
+# One embedding model + Chroma handle per process, warmed in the background at startup
+embedding_engine = get_engine()
+embedding_engine.start_background()
+# Concurrent sessions' query embeddings share batched forward passes
+embedding_batcher = get_batcher()
+# Repeat questions are answered from memory; a knowledge-base rebuild also drops the stale collection handle
+retrieval_cache = RetrievalCache(on_invalidate=embedding_engine.reset_collection)
+# Chroma (default) or the in-memory NumPy index - see RETRIEVAL_BACKEND
+retrieval_backend = get_backend(embedding_engine)
+# Diverse passages returned per query (MMR re-ranked within the request's category)
+RETRIEVAL_TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", "3"))
+# Answers checkTypeOfRequest from embeddings; the LLM is only asked below the confidence threshold
+request_classifier = LocalRequestClassifier(embedding_engine)
 
 AUDIO_DIR = "audio_files"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+# Synthesized audio is content-addressed and shared by all sessions; trimmed by a background GC
+tts_cache = TTSCache(AUDIO_DIR)
+tts_cache.start_gc()
+TTS_MODEL = os.environ.get("TTS_MODEL", "tts-1")
+TTS_VOICE = os.environ.get("TTS_VOICE", "alloy")
 
 user_accepted = {}
 
 # Fireworks AI configuration
-FIREWORKS_API_KEY = os.environ.get("FIREWORKS_API_KEY")
-FIREWORKS_API_URL = "https://api.fireworks.ai/inference/v1/chat/completions"
-# Updated model name - use the one that's available
-FIREWORKS_MODEL = "accounts/fireworks/models/kimi-k2-instruct-0905"
+# Shared pooled async client - LLM calls never block the Chainlit event loop
+fireworks_client = get_fireworks_client()
+
+SENIOR_CARE_SYSTEM_PROMPT = """
+        You are a helpful assistant specialized in senior care. Follow these guidelines:
+        - Do not repeat similar details.
+        - In your generated responses, focus on topics related to senior care, aging, elder support services, and related resources.
+        - When generating responses that include a list of items, avoid repeating similar details in each list item.
+        - List only the unique aspects of each item.
+        - If multiple items share common attributes, summarize these in a note at the end.
+        - Be concise and informative.
+        """
+
+# Stateless-branch answers keyed by query embedding; a hit skips the LLM call entirely
+answer_cache = SemanticAnswerCache(namespace=cache_namespace(SENIOR_CARE_SYSTEM_PROMPT, fireworks_client.model))
 
 # Make OpenAI optional - only for TTS/STT
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -42,72 +78,15 @@ if OPENAI_API_KEY:
 else:
     print("⚠️ OPENAI_API_KEY not found - TTS/STT features will be disabled")
 
+# Whisper by default; STT_BACKEND=stub transcribes locally without an API key
+stt_transcriber = get_transcriber(async_openai_client)
+if stt_transcriber and not FFMPEG_PATH:
+    print("⚠️ ffmpeg not found - voice input is transcribed in one pass after recording ends")
+
 # Fireworks AI helper functions
-async def call_fireworks_ai(messages, temperature=0.6, max_tokens=3000, stream=False):
+async def call_fireworks_ai(messages, temperature=0.6, max_tokens=3000, timeout=None):
     """Call Fireworks AI API with error handling"""
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {FIREWORKS_API_KEY}"
-    }
-    
-    payload = {
-        "model": FIREWORKS_MODEL,
-        "max_tokens": max_tokens,
-        "top_p": 1,
-        "top_k": 40,
-        "presence_penalty": 0,
-        "frequency_penalty": 0,
-        "temperature": temperature,
-        "messages": messages,
-        "stream": stream
-    }
-    
-    try:
-        if stream:
-            response = requests.post(FIREWORKS_API_URL, headers=headers, json=payload, stream=True, timeout=30)
-            response.raise_for_status()
-            return response
-        else:
-            response = requests.post(FIREWORKS_API_URL, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Fireworks API request error: {e}")
-        return {"error": {"message": str(e), "type": "request_error"}}
-    except Exception as e:
-        print(f"❌ Unexpected error in API call: {e}")
-        return {"error": {"message": str(e), "type": "unknown_error"}}
-
-def call_fireworks_ai_sync(messages, temperature=0.6, max_tokens=3000):
-    """Synchronous version for non-async functions with error handling"""
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {FIREWORKS_API_KEY}"
-    }
-    
-    payload = {
-        "model": FIREWORKS_MODEL,
-        "max_tokens": max_tokens,
-        "top_p": 1,
-        "top_k": 40,
-        "presence_penalty": 0,
-        "frequency_penalty": 0,
-        "temperature": temperature,
-        "messages": messages
-    }
-    
-    try:
-        response = requests.post(FIREWORKS_API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Fireworks API request error: {e}")
-        return {"error": {"message": str(e), "type": "request_error"}}
-    except Exception as e:
-        print(f"❌ Unexpected error in API call: {e}")
-        return {"error": {"message": str(e), "type": "unknown_error"}}
+    return await fireworks_client.chat(messages, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
 
 @cl.oauth_callback
 def oauth_callback(
@@ -155,11 +134,14 @@ def auth_callback(username: str, password: str):
         )
     return None
 
+WELCOME_DISCLAIMER = "⚠️ **Disclaimer:** By using this chatbot, you agree to the terms and conditions.\n\n"
+
+def is_welcome_step(step):
+    return step["type"] == "assistant_message" and (step.get("output") or "").startswith(WELCOME_DISCLAIMER)
+
 @cl.on_chat_start
 async def setup_health_chatbot():
     """Initialize chat session"""
-    global msg
-    
     app_user = cl.user_session.get("user")
     session_id = cl.user_session.get("id")
     
@@ -167,15 +149,18 @@ async def setup_health_chatbot():
     user_provider = app_user.metadata.get("provider", "")
     
     print(f"🔵 Chat started - User: {app_user.display_name} | Email: {user_email} | Provider: {user_provider}")
+    if not embedding_engine.ready:
+        print("⏳ Embedding engine still warming up")
     
     # Initialize session variables
-    cl.user_session.set("chat_history", [])
-    cl.user_session.set("conversation_history", [])
+    cl.user_session.set("transcript", Transcript())
     cl.user_session.set("question_queue", initialize_question_queue())
+    cl.user_session.set("question_verdicts", {})
     cl.user_session.set("tts", "Disabled")
+    cl.user_session.set("audio_messages", [])
     
     # Create welcome message
-    disclaimer = "⚠️ **Disclaimer:** By using this chatbot, you agree to the terms and conditions.\n\n"
+    disclaimer = WELCOME_DISCLAIMER
     greeting = f"Hello **{app_user.display_name}**! 👋\n\n"
     intro = "I'm Infomary Health Bot, here to help you with your health concerns. I can assist with:\n"
     intro += "- 🏥 Healthcare Services\n"
@@ -185,9 +170,7 @@ async def setup_health_chatbot():
     
     initial_message = disclaimer + greeting + intro
     
-    conversation_history = cl.user_session.get("conversation_history")
-    conversation_history.append(f"Assistant: {initial_message}")
-    
+    # The welcome/disclaimer is shown but kept out of the transcript - it's noise in every prompt
     await cl.Message(initial_message).send()
     
     # Setup settings if OpenAI is available
@@ -218,54 +201,63 @@ async def on_chat_resume(thread: cl.types.ThreadDict):
     
     print(f"🔄 Chat resumed - User: {app_user.display_name}")
     
-    cl.user_session.set("chat_history", [])
-    cl.user_session.set("conversation_history", [])
-    conversation_history = cl.user_session.get("conversation_history")
-    
-    for message in thread["steps"]:
-        if message["type"] == "user_message":
-            conversation_history.append(f"User: {message['output']}")
-            cl.user_session.get("chat_history").append({"role": "user", "content": message["output"]})
-        elif message["type"] == "assistant_message":
-            conversation_history.append(f"Assistant: {message['output']}")
-            cl.user_session.get("chat_history").append({"role": "assistant", "content": message["output"]})
-
-def retrieve_relevant_context(user_query, top_k=1):
-    """Retrieve the most relevant context from the Chroma vector store."""
+    # Same as a fresh session: the welcome message is never part of the transcript
+    steps = [step for step in thread["steps"] if not is_welcome_step(step)]
+    cl.user_session.set("transcript", Transcript.from_steps(steps))
+    cl.user_session.set("conversation_context", None)
+    cl.user_session.set("question_verdicts", {})
+    cl.user_session.set("audio_messages", [])
+
+async def embed_user_query(user_query):
+    """Query embedding via the cache, else the shared micro-batcher"""
+    query_embedding = retrieval_cache.get_embedding(user_query)
+    if query_embedding is None:
+        await embedding_engine.await_ready()
+        query_embedding = await embedding_batcher.embed_query(user_query)
+        retrieval_cache.put_embedding(user_query, query_embedding)
+    return query_embedding
+
+async def retrieve_relevant_context(user_query, top_k=RETRIEVAL_TOP_K, category=None):
+    """Retrieve diverse relevant passages, searching only the request's category partition."""
+    category = normalize_category(category)
+    cache_key = (top_k, category)
     try:
-        embedding_model = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        query_embedding = embedding_model.embed_query(user_query)
+        cached = retrieval_cache.get_results(user_query, cache_key)
+        if cached is not None:
+            return cached
 
-        try:
-            chroma_collection = db.get_collection(collection_name)
-        except Exception as e:
-            print(f"⚠️ Collection not found, creating new collection: {collection_name}")
-            chroma_collection = db.create_collection(
-                name=collection_name,
-                metadata={"description": "Health bot knowledge base"}
-            )
-            print(f"✅ Collection '{collection_name}' created successfully")
-            return []
-        
-        results = chroma_collection.query(query_embeddings=[query_embedding], n_results=top_k * 2)
-        
-        if not results['documents'] or not results['documents'][0]:
-            print("⚠️ No documents found in collection")
-            return []
-        
-        unique_context = list(OrderedDict.fromkeys(results['documents'][0]))[:top_k]
+        query_embedding = await embed_user_query(user_query)
+
+        unique_context = await asyncio.to_thread(_query_collection, query_embedding, top_k, category)
+        if unique_context:
+            retrieval_cache.put_results(user_query, cache_key, unique_context)
         return unique_context
     except Exception as e:
         print(f"❌ Error retrieving context: {e}")
         return []
 
+def _query_collection(query_embedding, top_k, category=None):
+    """Blocking part of retrieval - runs in a worker thread"""
+    if embedding_engine.get_collection() is None:
+        print(f"⚠️ Collection not found, creating new collection: {embedding_engine.collection_name}")
+        embedding_engine.get_collection(create=True)
+        return []
+
+    unique_context = search_partitioned(retrieval_backend, query_embedding, top_k, category)
+
+    if not unique_context:
+        print("⚠️ No documents found in collection")
+        return []
+
+    return unique_context
+
 def initialize_question_queue():
     return []
 
-async def generate_follow_up_questions(conversation_history, retrieved_context):
+async def generate_follow_up_questions(conversation, retrieved_context):
     """Generate follow-up questions using Fireworks AI"""
     prompt = f"""Given the following conversation history:
-{chr(10).join(conversation_history)}
+{conversation}
 
 Retrieved Context:
 {retrieved_context}
@@ -293,10 +285,10 @@ Questions should be clear, specific, and help gather important details about sym
         print(f"❌ Error generating questions: {e}")
         return []
 
-async def validate_question(conversation_history, next_question):
+async def validate_question(conversation, next_question):
     """Validate if question is relevant using Fireworks AI"""
     prompt = f"""Given the following conversation history:
-{chr(10).join(conversation_history)}
+{conversation}
 
 Determine if the following question helps in gathering useful information about the user's health. 
 Respond with 'yes' if it is relevant, otherwise 'no'.
@@ -305,7 +297,7 @@ Question: {next_question}"""
     messages = [{"role": "user", "content": prompt}]
     
     try:
-        response = await call_fireworks_ai(messages, temperature=0, max_tokens=3000)
+        response = await call_fireworks_ai(messages, temperature=0, max_tokens=10)
         
         # Check for errors
         if 'error' in response:
@@ -321,13 +313,59 @@ Question: {next_question}"""
         print(f"❌ Error validating question: {e}")
         return False
 
-def generate_health_advice(conversation_history, retrieved_context):
+async def validate_questions(conversation, questions, verdict_cache=None):
+    """Validate all candidate questions in one structured call; returns the relevant ones in order"""
+    verdict_cache = {} if verdict_cache is None else verdict_cache
+    pending = [q for q in dict.fromkeys(questions) if q not in verdict_cache]
+
+    if pending:
+        verdicts = await _validate_questions_batch(conversation, pending)
+        if verdicts is None:
+            # Batch answer was unusable - fall back to one call per question, in parallel
+            verdicts = await asyncio.gather(*(validate_question(conversation, q) for q in pending))
+        verdict_cache.update(zip(pending, verdicts))
+
+    return [q for q in questions if verdict_cache.get(q)]
+
+async def _validate_questions_batch(conversation, questions):
+    """One Fireworks call returning a yes/no verdict per question, or None if unparseable"""
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    prompt = f"""Given the following conversation history:
+{conversation}
+
+For each numbered question below, determine if it helps in gathering useful information about the user's health.
+Respond ONLY with a JSON array containing "yes" or "no" for each question, in the same order.
+
+Questions:
+{numbered}"""
+
+    messages = [{"role": "user", "content": prompt}]
+    
+    try:
+        response = await call_fireworks_ai(messages, temperature=0, max_tokens=8 * len(questions) + 16)
+        
+        if 'error' in response or 'choices' not in response:
+            print(f"❌ Batch validation failed: {response.get('error', response)}")
+            return None
+        
+        content = response['choices'][0]['message']['content']
+        match = re.search(r'\[.*?\]', content, re.DOTALL)
+        verdicts = json.loads(match.group(0)) if match else None
+        if not isinstance(verdicts, list) or len(verdicts) != len(questions):
+            print(f"⚠️ Unexpected batch validation answer: {content[:200]}")
+            return None
+        return ["yes" in str(v).lower() for v in verdicts]
+    except Exception as e:
+        print(f"❌ Error validating questions: {e}")
+        return None
+
+async def generate_health_advice(conversation, retrieved_context):
     """Generate health advice using Fireworks AI"""
     prompt = f"""Based on the following conversation history, provide a concise summary of the user's health concerns 
 and offer general advice, including possible conditions and when to seek medical attention:
 
 Chat History:
-{chr(10).join(conversation_history)}
+{conversation}
 
 Retrieved Context:
 {retrieved_context}
@@ -337,7 +375,7 @@ Provide advice or next steps:"""
     messages = [{"role": "user", "content": prompt}]
     
     try:
-        response = call_fireworks_ai_sync(messages, temperature=0, max_tokens=500)
+        response = await call_fireworks_ai(messages, temperature=0, max_tokens=500)
         
         # Check for errors
         if 'error' in response:
@@ -353,7 +391,68 @@ Provide advice or next steps:"""
         print(f"❌ Error generating advice: {e}")
         return "I apologize, but I encountered an error. Please try again."
 
-def checkTypeOfRequest(message):
+async def summarize_conversation(previous_summary, lines):
+    """Fold older turns into the running consultation summary using Fireworks AI"""
+    prompt = f"""Current summary of the consultation:
+{previous_summary or "(none yet)"}
+
+New messages:
+{chr(10).join(lines)}
+
+Update the summary with the new messages. Keep every symptom, duration, severity, medication and answer the user gave.
+Respond with the updated summary only, in under {CONTEXT_SUMMARY_TOKENS} tokens."""
+
+    messages = [{"role": "user", "content": prompt}]
+    response = await call_fireworks_ai(messages, temperature=0, max_tokens=CONTEXT_SUMMARY_TOKENS)
+    if 'error' in response or 'choices' not in response:
+        print(f"❌ Summary failed: {response.get('error', response)}")
+        return None
+    return response['choices'][0]['message']['content']
+
+def get_conversation_context():
+    """Session's token-budgeted view of the current consultation"""
+    context = cl.user_session.get("conversation_context")
+    if context is None:
+        context = ConversationContext(summarize=summarize_conversation)
+        cl.user_session.set("conversation_context", context)
+    return context
+
+async def checkTypeOfRequest(message):
+    """Categorize request locally from its embedding, deferring to Fireworks AI when unsure"""
+    local_label, confidence = None, 0.0
+    if embedding_engine.ready:
+        try:
+            embedding = await embed_user_query(message)
+            local_label, confidence = await asyncio.to_thread(request_classifier.predict, embedding)
+        except Exception as e:
+            print(f"⚠️ Local classifier failed, using LLM: {e}")
+
+    if local_label and request_classifier.is_confident(confidence):
+        request_classifier.record_route(used_local=True)
+        if request_classifier.should_shadow():
+            _spawn_background(_shadow_classification(message, local_label, confidence))
+        return local_label
+
+    request_classifier.record_route(used_local=False)
+    llm_label = await classify_request_with_llm(message)
+    if local_label:
+        request_classifier.record_comparison(local_label, confidence, normalize_category(llm_label) or llm_label.strip())
+    return llm_label
+
+async def _shadow_classification(message, local_label, confidence):
+    """Off the critical path: ask the LLM too, only to measure agreement"""
+    llm_label = await classify_request_with_llm(message)
+    request_classifier.record_comparison(local_label, confidence, normalize_category(llm_label) or llm_label.strip())
+
+_background_tasks = set()
+
+def _spawn_background(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def classify_request_with_llm(message):
     """Categorize request using Fireworks AI"""
     prompt = f"""Assign category (Healthcare Services, Medical Advice, Medical Procedures) to below mentioned request. Return only the category and no additional text.
 
@@ -364,7 +463,7 @@ def checkTypeOfRequest(message):
     messages = [{"role": "user", "content": prompt}]
     
     try:
-        response = call_fireworks_ai_sync(messages, temperature=0, max_tokens=500)
+        response = await call_fireworks_ai(messages, temperature=0, max_tokens=500, timeout=15)
         
         # Check for errors
         if 'error' in response:
@@ -381,41 +480,56 @@ def checkTypeOfRequest(message):
         print(f"❌ Error checking request type: {e}")
         return "Medical Advice"  # Default fallback
 
+async def prepare_follow_up(conversation, user_message, need_questions, verdict_cache=None):
+    """Follow-up branch preparation: retrieval, then (if the queue is empty) question generation + validation"""
+    retrieved_context = await retrieve_relevant_context(user_message, category=DEFAULT_CATEGORY)
+    questions = None
+    if need_questions:
+        candidates = await generate_follow_up_questions(conversation, "\n\n".join(retrieved_context))
+        questions = await validate_questions(conversation, candidates, verdict_cache)
+        print(f"✅ {len(questions)}/{len(candidates)} follow-up questions validated")
+    return retrieved_context, questions
+
+@cl.on_chat_end
+async def on_chat_end():
+    """Let the TTS cache collect this session's audio"""
+    tts_cache.release_session(cl.user_session.get("id"))
+
 @cl.on_message
 async def handle_message(message: cl.Message):
     """Handle incoming messages"""
-    global msg
-    global main_message
-    global type_of_request
-    type_of_request = ""
-    
-    chat_history = cl.user_session.get("chat_history")
+    # Turn state lives in the user session (or locals) - never module globals shared by all users
+    transcript = cl.user_session.get("transcript")
     session_id = cl.user_session.get("id")
     app_user = cl.user_session.get("user")
     user_message = message.content.lower()
-    conversation_history = cl.user_session.get("conversation_history", [])
+    conversation_history = transcript.prompt_lines()
     question_queue = cl.user_session.get("question_queue", [])
 
-    retrieved_context = retrieve_relevant_context(user_message)
+    timer = TurnTimer()
+    context = get_conversation_context()
 
-    if type_of_request == "" or len(question_queue) == 0:
-        main_message = user_message
-        type_of_request = checkTypeOfRequest(user_message)
-        print(f"📋 Request Type: {type_of_request}")
+    transcript.add_user(message.content)
+
+    # Classification and the follow-up branch's preparation don't depend on each other:
+    # start both now and cancel the follow-up work if the request turns out to be stateless
+    classify_task = timer.task("classify", checkTypeOfRequest(user_message))
+    follow_up_task = timer.task(
+        "follow_up_prep",
+        prepare_follow_up(
+            context.render(conversation_history), user_message,
+            need_questions=not question_queue,
+            verdict_cache=cl.user_session.get("question_verdicts")
+        )
+    )
 
-    conversation_history.append(f"User: {user_message}")
-    chat_history.append({"role": "user", "content": message.content})
+    type_of_request = await classify_task
+    print(f"📋 Request Type: {type_of_request}")
 
     if type_of_request.strip() in ['Healthcare Services', 'Medical Procedures']:
-        system_prompt = """
-        You are a helpful assistant specialized in senior care. Follow these guidelines:
-        - Do not repeat similar details.
-        - In your generated responses, focus on topics related to senior care, aging, elder support services, and related resources.
-        - When generating responses that include a list of items, avoid repeating similar details in each list item.
-        - List only the unique aspects of each item.
-        - If multiple items share common attributes, summarize these in a note at the end.
-        - Be concise and informative.
-        """
+        await cancel_tasks(follow_up_task)
+
+        system_prompt = SENIOR_CARE_SYSTEM_PROMPT
 
         messages = [
             {"role": "system", "content": system_prompt},
@@ -425,132 +539,181 @@ async def handle_message(message: cl.Message):
         stream_msg = cl.Message(content="")
         await stream_msg.send()
 
+        speech = None
         try:
-            response = await call_fireworks_ai(messages, stream=True)
-            
-            # Check if response is an error dict
-            if isinstance(response, dict) and 'error' in response:
-                await stream_msg.stream_token("I apologize, but I'm having trouble processing your request. Please try again.")
-                await stream_msg.update()
-                return
-            
             raw_response = ""
-            for line in response.iter_lines():
-                if line:
-                    line_text = line.decode('utf-8')
-                    if line_text.startswith('data: '):
-                        json_str = line_text[6:]
-                        if json_str.strip() == '[DONE]':
-                            break
-                        try:
-                            chunk_data = json.loads(json_str)
-                            delta = chunk_data['choices'][0].get('delta', {}).get('content', '')
-                            if delta:
-                                raw_response += delta
-                                await stream_msg.stream_token(delta)
-                        except json.JSONDecodeError:
-                            continue
-
+            stream_stats = StreamStats()
+            coalescer = TokenCoalescer(stream_msg.stream_token, stats=stream_stats)
+            # Repeated lines are dropped on the fly, so the streamed message is already the final answer
+            dedup = LineDeduplicator()
+            # Read-aloud starts on the first sentence while the rest of the answer is still streaming
+            speech = start_speech_pipeline()
+
+            query_embedding = None
+            cached_answer = None
+            if embedding_engine.ready:
+                try:
+                    query_embedding = await embed_user_query(user_message)
+                    cached_answer = await asyncio.to_thread(answer_cache.lookup, query_embedding)
+                except Exception as e:
+                    # The cache is an optimization: answer from the LLM rather than fail the turn
+                    print(f"⚠️ Answer cache lookup failed, treating as a miss: {e}")
+                    query_embedding, cached_answer = None, None
+            if cached_answer:
+                print("⚡ Semantic answer cache hit")
+                deltas = replay_text(cached_answer, stream_stats)
+            else:
+                deltas = iter_sse_deltas(fireworks_client.stream_lines(messages), stream_stats)
+
+            try:
+                async for delta in deltas:
+                    raw_response += delta
+                    cleaned = dedup.feed(delta)
+                    await coalescer.add(cleaned)
+                    if speech:
+                        speech.feed(cleaned)
+                cleaned = dedup.close()
+                await coalescer.add(cleaned)
+                await coalescer.close()
+                if speech:
+                    speech.feed(cleaned)
+                if raw_response and not cached_answer and query_embedding is not None:
+                    _spawn_background(asyncio.to_thread(answer_cache.store, user_message, query_embedding, raw_response))
+            except FireworksError as e:
+                print(f"❌ Fireworks streaming error: {e}")
+                cleaned = dedup.close()
+                await coalescer.add(cleaned)
+                await coalescer.close()
+                if speech:
+                    speech.feed(cleaned)
+                if not raw_response:
+                    if speech:
+                        await speech.cancel()
+                    await stream_msg.stream_token("I apologize, but I'm having trouble processing your request. Please try again.")
+                    await stream_msg.update()
+                    return
+            print(f"⏱️ Stream: {stream_stats.finish()}")
+            if stream_stats.first_token_at:
+                timer.mark("first_output", stream_stats.first_token_at)
+
+            cleaned_response = dedup.text
+            if not cleaned_response:
+                cleaned_response = "Sorry, I am not trained to answer this query or couldn't find relevant information."
+                await stream_msg.stream_token(cleaned_response)
+                if speech:
+                    speech.feed(cleaned_response)
             await stream_msg.update()
-            msg = stream_msg
-
-            if not raw_response:
-                raw_response = "Sorry, I am not trained to answer this query or couldn't find relevant information."
-
-            # Remove duplicates
-            unique_responses = []
-            seen = set()
-            count = 1
-
-            for line in raw_response.split("\n"):
-                stripped_line = line.strip()
-                match = re.match(r'^(\d+)\.\s*(.*)', stripped_line)
-                
-                if match:
-                    clean_line = match.group(2)
-                    if clean_line and clean_line not in seen:
-                        seen.add(clean_line)
-                        unique_responses.append(f"{count}. {clean_line}")
-                        count += 1
-                else:
-                    if stripped_line and stripped_line not in seen:
-                        seen.add(stripped_line)
-                        unique_responses.append(f"\n{stripped_line}")
-
-            cleaned_response = "\n".join(unique_responses)
-
-            conversation_history.append(f"Assistant: {cleaned_response}")
-            chat_history.append({"role": "assistant", "content": cleaned_response})
+
+            transcript.add_assistant(cleaned_response)
             
-            await show_and_play_the_message(cleaned_response, session_id)
+            if speech:
+                await speech.close()
+                if speech.first_audio_at:
+                    timer.mark("first_audio", speech.first_audio_at)
+            else:
+                await show_and_play_the_message(cleaned_response, session_id, message=stream_msg)
 
-            type_of_request = ""
-            cl.user_session.set("conversation_history", [])
+            transcript.start_consultation()
+            context.reset()
         except Exception as e:
+            if speech:
+                await speech.cancel()
             print(f"❌ Error in message handling: {e}")
             await cl.Message("I apologize, but I encountered an error. Please try again.").send()
     else:
+        retrieved_context, generated_questions = await follow_up_task
         if not question_queue:
-            question_queue = await generate_follow_up_questions(conversation_history, " ".join(retrieved_context))
+            question_queue = generated_questions or []
             cl.user_session.set("question_queue", question_queue)
 
+        # Queue only holds pre-validated questions, so picking the next one is local
         next_question = question_queue.pop(0) if question_queue else None
 
         if next_question:
-            is_relevant = await validate_question(conversation_history, next_question)
-            if is_relevant:
-                conversation_history.append(f"Assistant: {next_question}")
-                chat_history.append({"role": "assistant", "content": next_question})
-                await show_and_play_the_message(next_question, session_id)
-            else:
-                await handle_message(message)
+            transcript.add_assistant(next_question)
+            timer.mark("first_output")
+            await show_and_play_the_message(next_question, session_id, timer=timer)
 
-        cl.user_session.set("conversation_history", conversation_history)
         cl.user_session.set("question_queue", question_queue)
 
         if not question_queue:
-            health_advice = generate_health_advice(conversation_history, " ".join(retrieved_context))
-            await show_and_play_the_message("Here's a summary of your concerns and some advice:\n" + health_advice, session_id)
-
-            print(conversation_history)
-            type_of_request = ""
-            cl.user_session.set("conversation_history", [])
+            health_advice = await generate_health_advice(context.render(conversation_history), "\n\n".join(retrieved_context))
+            timer.mark("first_output")
+            await show_and_play_the_message("Here's a summary of your concerns and some advice:\n" + health_advice, session_id, timer=timer)
 
-@cl.step(type="tool", name="Speech to text")
-async def speech_to_text(audio_file):
-    """Speech-to-text with OpenAI"""
-    if not async_openai_client:
-        print("⚠️ Speech-to-text is disabled - OPENAI_API_KEY not set")
-        return "Speech-to-text is disabled."
-    
-    try:
-        response = await async_openai_client.audio.transcriptions.create(
-            model="whisper-1", file=audio_file
-        )
-        return response.text
-    except Exception as e:
-        print(f"❌ Speech-to-text error: {e}")
-        return "Speech-to-text failed."
+            print(list(conversation_history))
+            transcript.start_consultation()
+            context.reset()
+        else:
+            # Consultation continues: summarize turns leaving the window before the next prompt needs them
+            _spawn_background(context.update(list(conversation_history)))
+
+    await cancel_tasks(follow_up_task)
+    print(f"⏱️ Turn: {timer.report()}")
+
+@cl.on_audio_chunk
+async def on_audio_chunk(chunk: cl.AudioChunk):
+    """
+    Buffer the recording in memory and transcribe each utterance while the user is still
+    talking. Chainlit 1.3's recorder sends audio/webm, which is decoded to PCM through ffmpeg
+    for the VAD; without ffmpeg it is transcribed once at the end.
+    """
+    if not stt_transcriber:
+        return
+    if chunk.isStart:
+        previous = cl.user_session.get("transcription")
+        if previous:
+            await previous.cancel()
+        cl.user_session.set("transcription", StreamingTranscription(stt_transcriber, chunk.mimeType))
+    transcription = cl.user_session.get("transcription")
+    if transcription:
+        transcription.add_chunk(chunk.data)
+
+@cl.on_audio_end
+async def on_audio_end(elements):
+    """Finish the transcript and answer it like a typed message"""
+    transcription = cl.user_session.get("transcription")
+    cl.user_session.set("transcription", None)
+    if not transcription or not transcription.buffer:
+        return
+
+    transcript = await transcription.finish()
+    print(f"🎙️ Speech: {transcription}")
+    if not transcript:
+        await cl.Message("Sorry, I couldn't make out what you said. Please try again.").send()
+        return
+
+    input_audio = cl.Audio(name=transcription.name, content=transcription.audio, mime=transcription.audio_mime_type)
+    message = cl.Message(author="You", type="user_message", content=transcript, elements=[input_audio, *elements])
+    await message.send()
+    await handle_message(message)
+
+async def show_and_play_the_message(text, session_id, message=None, timer=None):
+    """Display and optionally play message; pass an already streamed message to only add audio"""
+    speech = start_speech_pipeline()
+    if speech:
+        if message is None:
+            await cl.Message(content=text).send()
+        speech.feed(text)
+        await speech.close()
+        if timer and speech.first_audio_at:
+            timer.mark("first_audio", speech.first_audio_at)
+        return
 
-async def show_and_play_the_message(text, session_id):
-    """Display and optionally play message"""
-    global msg
-    
     audio_file_path = await text_to_speech(text, session_id)
-    await cl.Message(content=text).send()
-    
-    try:
-        await msg.remove()
-    except:
-        pass
+    if message is None:
+        await cl.Message(content=text).send()
     
     if cl.user_session.get("tts", "Disabled") == "Enabled" and audio_file_path:
-        try:
-            await msg.remove()
-        except:
-            pass
-        msg = cl.Message("", elements=[cl.Audio(auto_play=True, path=audio_file_path, mime="audio/mpeg", display="inline")])
-        await msg.send()
+        # Only this session's previous audio player is replaced
+        for old in cl.user_session.get("audio_messages") or []:
+            try:
+                await old.remove()
+            except Exception:
+                pass
+        audio_message = cl.Message("", elements=[cl.Audio(auto_play=True, path=audio_file_path, mime="audio/mpeg", display="inline")])
+        await audio_message.send()
+        cl.user_session.set("audio_messages", [audio_message])
 
 async def text_to_speech(text, session_id):
     """Text-to-speech with OpenAI"""
@@ -559,34 +722,46 @@ async def text_to_speech(text, session_id):
     
     if cl.user_session.get("tts", "Disabled") == "Enabled":
         try:
-            # Clean up old audio files
-            for f in os.listdir(AUDIO_DIR):
-                if f.endswith(".mp3"):
-                    os.remove(os.path.join(AUDIO_DIR, f))
-
-            session_dir = os.path.join(".files", session_id)
-            if os.path.exists(session_dir) and os.path.isdir(session_dir):
-                for f in os.listdir(session_dir):
-                    if f.endswith(".mp3"):
-                        os.remove(os.path.join(session_dir, f))
-
-            # Generate TTS
-            response = await async_openai_client.audio.speech.create(
-                model="tts-1", voice="alloy", input=text
-            )
-            audio_data = await response.aread()
-
-            filename = f"{uuid.uuid4()}.mp3"
-            filepath = os.path.join(AUDIO_DIR, filename)
-            with open(filepath, "wb") as f:
-                f.write(audio_data)
-
-            return filepath
+            return await tts_cache.get_or_synthesize(TTS_VOICE, TTS_MODEL, text, synthesize_speech, session_id)
         except Exception as e:
             print(f"❌ Text-to-speech error: {e}")
             return None
     return None
 
+async def synthesize_speech(text):
+    """One OpenAI TTS call, returns MP3 bytes"""
+    response = await async_openai_client.audio.speech.create(
+        model=TTS_MODEL, voice=TTS_VOICE, input=text
+    )
+    return await response.aread()
+
+def start_speech_pipeline():
+    """Sentence-pipelined read-aloud for this turn, or None when it's off"""
+    if not (TTS_PIPELINE and async_openai_client and cl.user_session.get("tts", "Disabled") == "Enabled"):
+        return None
+
+    session_id = cl.user_session.get("id")
+    previous = cl.user_session.get("audio_messages") or []
+    delivered = []
+    cl.user_session.set("audio_messages", delivered)
+
+    async def synthesize(sentence):
+        return await tts_cache.get_or_synthesize(TTS_VOICE, TTS_MODEL, sentence, synthesize_speech, session_id)
+
+    async def deliver(audio, sentence):
+        # Last turn's clips are only cleared once this turn has something to say
+        if not delivered:
+            for old in previous:
+                try:
+                    await old.remove()
+                except Exception:
+                    pass
+        clip = cl.Message("", elements=[cl.Audio(auto_play=True, path=audio, mime="audio/mpeg", display="inline")])
+        await clip.send()
+        delivered.append(clip)
+
+    return SpeechPipeline(synthesize, deliver)
+
 if __name__ == "__main__":
     from chainlit.cli import run_chainlit
     run_chainlit(__file__)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Benchmark: Chroma vs NumPy retrieval backend
+Builds synthetic MiniLM-sized (384-d) collections at several sizes and compares
+p50/p99 top-k query latency of the Chroma path and the memory-mapped NumPy index.
+
+Usage:
+    python bench_retrieval.py [--sizes 1000 10000 100000] [--queries 200] [--top-k 2]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from vector_index import NumpyVectorIndex
+
+DIM = 384
+ADD_BATCH = 5000
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1000, q))
+
+
+def time_queries(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run(size, n_queries, top_k, rng):
+    vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"bench#{i}" for i in range(size)]
+    documents = [f"synthetic chunk {i}" for i in range(size)]
+    queries = rng.standard_normal((n_queries, DIM)).astype(np.float32)
+
+    workdir = tempfile.mkdtemp(prefix="infomary_bench_")
+    try:
+        client = chromadb.PersistentClient(path=workdir, settings=Settings(allow_reset=True, anonymized_telemetry=False))
+        collection = client.create_collection("bench")
+        for i in range(0, size, ADD_BATCH):
+            collection.add(ids=ids[i:i + ADD_BATCH], embeddings=vectors[i:i + ADD_BATCH].tolist(),
+                           documents=documents[i:i + ADD_BATCH])
+
+        index = NumpyVectorIndex.from_embeddings(vectors, ids, documents)
+        index.save(f"{workdir}/numpy_index")
+        index = NumpyVectorIndex.load(f"{workdir}/numpy_index")
+
+        # Warm both paths before measuring
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=top_k)
+        index.query(queries[0], top_k)
+
+        chroma = time_queries(lambda q: collection.query(query_embeddings=[q.tolist()], n_results=top_k), queries)
+        numpy_ = time_queries(lambda q: index.query(q, top_k), queries)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "chroma": (percentile_ms(chroma, 50), percentile_ms(chroma, 99)),
+        "numpy": (percentile_ms(numpy_, 50), percentile_ms(numpy_, 99)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy retrieval latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print("=" * 60)
+    print(f"{'chunks':>8} | {'backend':>7} | {'p50 ms':>8} | {'p99 ms':>8}")
+    print("-" * 60)
+    for size in args.sizes:
+        result = run(size, args.queries, args.top_k, rng)
+        for backend, (p50, p99) in result.items():
+            print(f"{size:>8} | {backend:>7} | {p50:>8.3f} | {p99:>8.3f}")
+    print("=" * 60)
@@ -0,0 +1,81 @@
+"""
+Benchmark: per-session conversation memory, old history lists vs Transcript
+Simulates consultations of alternating user messages and assistant answers and measures
+the heap each representation holds per session with tracemalloc.
+
+Usage:
+    python bench_transcript.py [--sessions 200] [--consultations 5] [--turns 12]
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from transcript import Transcript
+
+WORDS = ("pain sleep blood pressure dizzy knee doctor medication daily weeks mild severe morning night "
+         "assisted living care home family appointment symptoms exercise diet water rest fever").split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def messages(rng, consultations, turns):
+    for _ in range(consultations):
+        for _ in range(turns):
+            yield "user", sentence(rng, rng.randint(6, 25))
+            yield "assistant", " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(1, 12)))
+        yield None, None  # consultation finished
+
+
+def build_legacy(stream):
+    """What app.py kept before: formatted prompt strings + role/content dicts"""
+    chat_history, conversation_history = [], []
+    for role, text in stream:
+        if role is None:
+            conversation_history = []
+            continue
+        conversation_history.append(f"{role.capitalize()}: {text.lower() if role == 'user' else text}")
+        chat_history.append({"role": role, "content": text})
+    return chat_history, conversation_history
+
+
+def build_transcript(stream):
+    transcript = Transcript()
+    for role, text in stream:
+        if role is None:
+            transcript.start_consultation()
+        else:
+            transcript.add(role, text)
+    return transcript
+
+
+def measure(builder, sessions, consultations, turns, seed):
+    # Messages are generated inside the measurement: like in the app, the history holds the only reference
+    rng = random.Random(seed)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [builder(messages(rng, consultations, turns)) for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-session transcript memory")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--consultations", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    legacy = measure(build_legacy, args.sessions, args.consultations, args.turns, args.seed)
+    compact = measure(build_transcript, args.sessions, args.consultations, args.turns, args.seed)
+    print("=" * 60)
+    print(f"{args.consultations} consultations x {args.turns} turns per session, {args.sessions} sessions")
+    print(f"{'history lists':>16} | {legacy / 1024:>8.1f} KB/session")
+    print(f"{'Transcript':>16} | {compact / 1024:>8.1f} KB/session")
+    print(f"{'ratio':>16} | {legacy / compact:>8.1f}x")
+    print("=" * 60)
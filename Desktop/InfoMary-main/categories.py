@@ -0,0 +1,65 @@
+"""
+Request / knowledge-base categories shared by classification, ingestion and retrieval
+"""
+
+import threading
+
+import numpy as np
+
+CATEGORIES = ["Healthcare Services", "Medical Advice", "Medical Procedures"]
+DEFAULT_CATEGORY = "Medical Advice"
+
+# Prototype descriptions used to tag chunks at ingest time
+CATEGORY_DESCRIPTIONS = {
+    "Healthcare Services": (
+        "Senior care services and facilities: assisted living, nursing homes, memory care, "
+        "home health care, respite care for caregivers, rehabilitation centers, elder support "
+        "resources and how to find or pay for care providers."
+    ),
+    "Medical Advice": (
+        "Symptoms, illnesses and chronic conditions such as colds, high blood pressure or diabetes, "
+        "how to manage them day to day, diet, exercise, medication and when to seek medical attention."
+    ),
+    "Medical Procedures": (
+        "Medical procedures, surgeries, tests, screenings and therapies such as physical therapy: "
+        "what happens, how to prepare, risks and recovery."
+    ),
+}
+
+
+def normalize_category(label):
+    """Map free-form LLM output (e.g. 'Category: medical advice.') to a canonical category"""
+    text = (label or "").strip().lower()
+    for category in CATEGORIES:
+        if category.lower() in text:
+            return category
+    return None
+
+
+class CategoryTagger:
+    """Assign each embedding to the nearest category prototype (cosine similarity)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._prototypes = None
+        self._lock = threading.Lock()
+
+    @property
+    def prototypes(self):
+        if self._prototypes is None:
+            with self._lock:
+                if self._prototypes is None:
+                    vectors = np.asarray(
+                        self.engine.embed_documents([CATEGORY_DESCRIPTIONS[c] for c in CATEGORIES]),
+                        dtype=np.float32
+                    )
+                    self._prototypes = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return self._prototypes
+
+    def tag(self, embeddings):
+        if len(embeddings) == 0:
+            return []
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        best = np.argmax(matrix @ self.prototypes.T, axis=1)
+        return [CATEGORIES[i] for i in best]
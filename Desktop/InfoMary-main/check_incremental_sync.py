@@ -0,0 +1,85 @@
+"""
+Check: incremental sync cost follows the size of the edit
+Syncs a multi-chunk source into a throwaway Chroma collection, inserts one paragraph near the
+top (which shifts every later positional id), re-syncs, and asserts only the new chunk was
+embedded. A hashed bag-of-words embedder stands in for MiniLM, so no model download is needed.
+
+Usage:
+    python check_incremental_sync.py [--paragraphs 200]
+"""
+
+import argparse
+import hashlib
+import re
+import shutil
+import tempfile
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+import populate_db
+from populate_db import IncrementalIndexer, make_chunks
+
+DIM = 384
+
+
+class CountingEmbedder:
+    """Deterministic stand-in for the embedding engine that counts what it embeds"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        vectors = []
+        for text in texts:
+            vector = np.zeros(DIM, dtype=np.float32)
+            for word in re.findall(r"\w+", text.lower()):
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+            vectors.append((vector / (np.linalg.norm(vector) or 1.0)).tolist())
+        return vectors
+
+
+def sync(collection, engine, source, text, batch_size):
+    indexer = IncrementalIndexer(collection, engine, batch_size=batch_size)
+    indexer.tagger.tag([[1.0] * DIM])  # embed the category prototypes before counting
+    engine.embedded = 0
+    indexer.add_many(make_chunks(source, text, max_chars=200))
+    return indexer.finish(), engine.embedded
+
+
+def main(paragraphs, batch_size):
+    populate_db.bump_kb_version = lambda: None  # don't signal a real knowledge base
+    body = [f"Paragraph {i} about senior care topic number {i} with some detail." * 2 for i in range(paragraphs)]
+    workdir = tempfile.mkdtemp(prefix="infomary_sync_")
+    try:
+        client = chromadb.PersistentClient(path=workdir, settings=Settings(allow_reset=True, anonymized_telemetry=False))
+        collection = client.create_collection("sync_check")
+        engine = CountingEmbedder()
+
+        stats, embedded = sync(collection, engine, "kb/guide.md", "\n\n".join(body), batch_size)
+        print(f"initial sync: {stats['upserted']} chunks, {embedded} embedded")
+
+        edited = body[:2] + ["A brand new paragraph about fall prevention at home, grab bars and better lighting. " * 2] + body[2:]
+        stats, embedded = sync(collection, engine, "kb/guide.md", "\n\n".join(edited), batch_size)
+        print(f"after inserting one paragraph: {stats['upserted']} upserted, {embedded} embedded, "
+              f"{stats['reused']} reused, {stats['deleted']} deleted")
+        assert embedded == 1, f"expected 1 chunk embedded, got {embedded}"
+        assert collection.count() == paragraphs + 1
+
+        # Every stored chunk must carry the embedding of its own content
+        stored = collection.get(include=["documents", "embeddings"])
+        expected = engine.embed_documents(stored["documents"])
+        assert np.allclose(np.asarray(stored["embeddings"]), np.asarray(expected), atol=1e-6)
+        print("✅ only the inserted chunk was embedded; reused embeddings match their content")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that an edit near the top re-embeds only the edit")
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    main(args.paragraphs, args.batch_size)
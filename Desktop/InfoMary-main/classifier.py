@@ -0,0 +1,124 @@
+"""
+Local request classifier for InfoMary
+Nearest-centroid over labelled example requests, using the already-loaded MiniLM embeddings.
+checkTypeOfRequest only falls back to the LLM when the local confidence is below the threshold.
+"""
+
+import os
+import random
+import threading
+
+import numpy as np
+
+from categories import CATEGORIES
+
+LOCAL_CLASSIFIER_THRESHOLD = float(os.environ.get("LOCAL_CLASSIFIER_THRESHOLD", "0.6"))
+# Fraction of confident local answers also sent to the LLM off the critical path, to measure agreement
+LOCAL_CLASSIFIER_SHADOW_RATE = float(os.environ.get("LOCAL_CLASSIFIER_SHADOW_RATE", "0.05"))
+SOFTMAX_TEMPERATURE = 0.05
+STATS_LOG_EVERY = 50
+
+LABELLED_EXAMPLES = {
+    "Healthcare Services": [
+        "what assisted living options are available for my mother",
+        "how do i find a nursing home near me",
+        "tell me about memory care facilities",
+        "i need respite care while i travel",
+        "what home health care services do you offer",
+        "how much does senior living cost",
+        "are there adult day care programs for seniors",
+        "can someone help my father with daily activities at home",
+        "what is the difference between assisted living and a nursing home",
+        "does medicare cover home care services",
+    ],
+    "Medical Advice": [
+        "i have a headache and a fever",
+        "my blood pressure has been high lately what should i do",
+        "i keep feeling dizzy when i stand up",
+        "how can i manage my diabetes better",
+        "i have a sore throat and runny nose",
+        "my knee hurts when i walk",
+        "i have been feeling tired all the time",
+        "is it normal to have chest pain after exercise",
+        "what should i eat to lower my cholesterol",
+        "i can't sleep at night",
+    ],
+    "Medical Procedures": [
+        "what happens during a colonoscopy",
+        "how long is the recovery after hip replacement surgery",
+        "how do i prepare for cataract surgery",
+        "what is physical therapy like after a stroke",
+        "what are the risks of a knee replacement",
+        "how is an mri performed",
+        "what should i expect from a cardiac catheterization",
+        "how often should seniors get a mammogram",
+        "is dialysis painful",
+        "what is involved in a bone density test",
+    ],
+}
+
+
+class LocalRequestClassifier:
+    """Nearest-centroid classifier with a softmax confidence score"""
+
+    def __init__(self, engine, examples=LABELLED_EXAMPLES, threshold=LOCAL_CLASSIFIER_THRESHOLD,
+                 shadow_rate=LOCAL_CLASSIFIER_SHADOW_RATE):
+        self.engine = engine
+        self.examples = examples
+        self.threshold = threshold
+        self.shadow_rate = shadow_rate
+        self.labels = [c for c in CATEGORIES if c in examples]
+        self._centroids = None
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "fallback": 0, "compared": 0, "agreed": 0}
+
+    @property
+    def centroids(self):
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    rows = []
+                    for label in self.labels:
+                        vectors = np.asarray(self.engine.embed_documents(self.examples[label]), dtype=np.float32)
+                        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                        centroid = vectors.mean(axis=0)
+                        rows.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = np.vstack(rows)
+        return self._centroids
+
+    def predict(self, embedding):
+        """Return (label, confidence) for a query embedding"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        logits = (self.centroids @ query) / SOFTMAX_TEMPERATURE
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def is_confident(self, confidence):
+        return confidence >= self.threshold
+
+    def should_shadow(self):
+        return random.random() < self.shadow_rate
+
+    def record_route(self, used_local):
+        """Count whether a request was answered locally or deferred to the LLM"""
+        self.stats["local" if used_local else "fallback"] += 1
+        total = self.stats["local"] + self.stats["fallback"]
+        if total % STATS_LOG_EVERY == 0:
+            print(f"📈 Classifier: {self.summary()}")
+
+    def record_comparison(self, local_label, confidence, llm_label):
+        """Log a local vs LLM comparison so the threshold can be tuned"""
+        self.stats["compared"] += 1
+        self.stats["agreed"] += int(local_label == llm_label)
+        print(f"🔍 Classifier: local={local_label} ({confidence:.2f}) llm={llm_label} "
+              f"{'agree' if local_label == llm_label else 'DISAGREE'}")
+
+    def summary(self):
+        total = self.stats["local"] + self.stats["fallback"]
+        local_rate = self.stats["local"] / total if total else 0.0
+        agreement = self.stats["agreed"] / self.stats["compared"] if self.stats["compared"] else 0.0
+        return (f"{local_rate:.0%} answered locally (threshold {self.threshold}), "
+                f"agreement with LLM {agreement:.0%} over {self.stats['compared']} comparisons")
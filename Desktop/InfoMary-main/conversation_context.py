@@ -0,0 +1,125 @@
+"""
+Token-budgeted conversation context for InfoMary's prompt builders
+Recent turns are passed verbatim up to a fixed token budget; turns that fall out of the window are
+folded into a running summary off the critical path, so prompt size stays flat however long the
+consultation runs.
+"""
+
+import asyncio
+import os
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "1200"))
+CONTEXT_RECENT_TURNS = int(os.environ.get("CONTEXT_RECENT_TURNS", "8"))
+CONTEXT_SUMMARY_TOKENS = int(os.environ.get("CONTEXT_SUMMARY_TOKENS", "250"))
+TOKEN_ENCODING = os.environ.get("TOKEN_ENCODING", "cl100k_base")
+
+_encoding = None
+
+
+def count_tokens(text):
+    """tiktoken count, or a chars/4 estimate when the encoding isn't available"""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        except Exception as e:
+            print(f"⚠️ tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class ConversationContext:
+    """
+    Rolling window + incremental summary over a list of "Role: text" lines.
+    summarize(previous_summary, lines) -> str is awaited only from update(), never from render().
+    """
+
+    def __init__(self, summarize=None, budget=CONTEXT_TOKEN_BUDGET, recent_turns=CONTEXT_RECENT_TURNS,
+                 summary_tokens=CONTEXT_SUMMARY_TOKENS):
+        self.summarize = summarize
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.summarized = 0  # lines [0, summarized) are covered by the summary
+        self.generation = 0  # bumped by reset(); an update() started before a reset is discarded
+        self._token_cache = {}
+        self._lock = asyncio.Lock()
+
+    def reset(self):
+        self.generation += 1
+        self.summary = ""
+        self.summarized = 0
+        self._token_cache.clear()
+
+    def _tokens(self, line):
+        tokens = self._token_cache.get(line)
+        if tokens is None:
+            tokens = self._token_cache[line] = count_tokens(line)
+        return tokens
+
+    def render(self, lines):
+        """Bounded prompt text: the summary, then as many of the newest unsummarized lines as fit"""
+        if self.summarized > len(lines):
+            # History was cleared behind our back
+            self.reset()
+        header = f"Summary of earlier conversation: {self.summary}" if self.summary else ""
+        remaining = self.budget - (self._tokens(header) if header else 0)
+
+        window = []
+        for line in reversed(lines[self.summarized:]):
+            cost = self._tokens(line)
+            if cost > remaining:
+                break
+            window.append(line)
+            remaining -= cost
+        window.reverse()
+
+        skipped = len(lines) - self.summarized - len(window)
+        parts = [header] if header else []
+        if skipped:
+            parts.append(f"({skipped} earlier messages omitted)")
+        parts.extend(window)
+        return "\n".join(parts)
+
+    async def update(self, lines):
+        """Fold turns older than the recent window into the summary"""
+        if self.summarize is None:
+            return
+        async with self._lock:
+            if self.summarized > len(lines):
+                self.reset()
+            cutoff = len(lines) - self.recent_turns
+            # Summarize in batches of half a window rather than one LLM call per turn
+            if cutoff - self.summarized < max(1, self.recent_turns // 2):
+                return
+            older = lines[self.summarized:cutoff]
+            generation = self.generation
+            try:
+                summary = await self.summarize(self.summary, older)
+            except Exception as e:
+                print(f"❌ Error summarizing conversation: {e}")
+                return
+            if generation != self.generation:
+                # New chat or consultation while we were summarizing; this summary is of the old one
+                return
+            if summary:
+                self.summary = summary.strip()
+                self.summarized = cutoff
+                for line in older:
+                    self._token_cache.pop(line, None)
+
+    def stats(self, lines):
+        return {
+            "lines": len(lines),
+            "summarized": self.summarized,
+            "summary_tokens": self._tokens(self.summary) if self.summary else 0,
+            "prompt_tokens": self._tokens(self.render(lines)),
+        }
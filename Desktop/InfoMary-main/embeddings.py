@@ -0,0 +1,274 @@
+"""
+Shared embedding engine for InfoMary retrieval
+Loads the MiniLM model and the Chroma client ONCE per process and reuses them
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import chromadb
+from chromadb.config import Settings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+DB_PATH = "./db"
+COLLECTION_NAME = "MATZ_Health_Bot"
+COLLECTION_METADATA = {"description": "Health bot knowledge base"}
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Micro-batching of concurrent query embeddings
+EMBED_BATCH_MAX_SIZE = int(os.environ.get("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", "5"))
+
+
+class EmbeddingEngine:
+    """Process-wide embedding model + Chroma collection handle"""
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, db_path=DB_PATH, collection_name=COLLECTION_NAME):
+        self.model_name = model_name
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self._model = None
+        self._client = None
+        self._collection = None
+        self._load_lock = threading.Lock()
+        self._collection_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._load_error = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Create the model and client and run one warm-up embedding (idempotent)"""
+        if self._ready.is_set():
+            return self
+        with self._load_lock:
+            if self._ready.is_set():
+                return self
+            try:
+                print(f"🔄 Loading embedding model: {self.model_name}")
+                self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+                # First call pays tokenizer/graph init - do it here, not on a user turn
+                self._model.embed_query("warm up")
+                self._client = chromadb.PersistentClient(path=self.db_path, settings=Settings(allow_reset=True))
+                self._load_error = None
+                self._ready.set()
+                print(f"✅ Embedding engine ready ({self.model_name})")
+            except Exception as e:
+                self._load_error = e
+                print(f"❌ Embedding engine failed to load: {e}")
+                raise
+        return self
+
+    def start_background(self):
+        """Warm the engine on a daemon thread so app startup is not blocked"""
+        if self._ready.is_set():
+            return
+        threading.Thread(target=self._load_quietly, name="embedding-warmup", daemon=True).start()
+
+    def _load_quietly(self):
+        try:
+            self.load()
+        except Exception:
+            pass
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the engine is loaded; loads inline if no warm-up is running"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.is_set():
+            if not self._load_lock.locked():
+                self.load()
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._ready.wait(0.1)
+        return True
+
+    async def await_ready(self, timeout=None):
+        """Async readiness signal for Chainlit handlers"""
+        if self._ready.is_set():
+            return True
+        return await asyncio.to_thread(self.wait_until_ready, timeout)
+
+    # ------------------------------------------------------------------
+    # Embeddings
+    # ------------------------------------------------------------------
+
+    @property
+    def model(self):
+        if not self._ready.is_set():
+            self.load()
+        return self._model
+
+    @property
+    def client(self):
+        if not self._ready.is_set():
+            self.load()
+        return self._client
+
+    def embed_query(self, text):
+        return self.model.embed_query(text)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        return self.model.embed_documents(list(texts))
+
+    async def aembed_query(self, text):
+        return await asyncio.to_thread(self.embed_query, text)
+
+    async def aembed_documents(self, texts):
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    # ------------------------------------------------------------------
+    # Collection handle
+    # ------------------------------------------------------------------
+
+    def get_collection(self, create=False):
+        """Return the cached collection handle, or None if it does not exist"""
+        if self._collection is not None:
+            return self._collection
+        with self._collection_lock:
+            if self._collection is None:
+                try:
+                    self._collection = self.client.get_collection(self.collection_name)
+                except Exception:
+                    if not create:
+                        return None
+                    self._collection = self.client.get_or_create_collection(
+                        name=self.collection_name,
+                        metadata=COLLECTION_METADATA
+                    )
+                    print(f"✅ Collection '{self.collection_name}' created successfully")
+            return self._collection
+
+    def reset_collection(self):
+        """Forget the cached handle (e.g. after populate_db recreated the collection)"""
+        with self._collection_lock:
+            self._collection = None
+
+
+class EmbeddingBatcher:
+    """
+    In-process embedding queue for concurrent Chainlit sessions.
+    Requests arriving within a short window are embedded together in one
+    embed_documents forward pass; each caller gets its own future back.
+    """
+
+    def __init__(self, engine, max_batch_size=EMBED_BATCH_MAX_SIZE, window_ms=EMBED_BATCH_WINDOW_MS):
+        self.engine = engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        self._requests = 0
+        self._batches = 0
+        self._embedded = 0
+        self._largest_batch = 0
+        self._last_batch_size = 0
+        self._batch_seconds = 0.0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    def submit(self, text):
+        """Queue a query and return a future resolving to its embedding"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        self._requests += 1
+        return future
+
+    async def embed_query(self, text):
+        return await self.submit(text)
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    # Window closed - still take whatever is already waiting
+                    while len(batch) < self.max_batch_size and not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        pending = [(text, future) for text, future in batch if not future.cancelled()]
+        if not pending:
+            return
+        started = time.perf_counter()
+        try:
+            vectors = await asyncio.to_thread(self.engine.embed_documents, [text for text, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._batch_seconds += time.perf_counter() - started
+            self._batches += 1
+            self._embedded += len(pending)
+            self._last_batch_size = len(pending)
+            self._largest_batch = max(self._largest_batch, len(pending))
+        for (_, future), vector in zip(pending, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "requests": self._requests,
+            "batches": self._batches,
+            "avg_batch_size": round(self._embedded / self._batches, 2) if self._batches else 0,
+            "last_batch_size": self._last_batch_size,
+            "largest_batch": self._largest_batch,
+            "avg_batch_ms": round(self._batch_seconds / self._batches * 1000, 2) if self._batches else 0,
+        }
+
+
+_engine = None
+_batcher = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide EmbeddingEngine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = EmbeddingEngine()
+    return _engine
+
+
+def get_batcher():
+    """Return the process-wide EmbeddingBatcher bound to the shared engine"""
+    global _batcher
+    if _batcher is None:
+        with _engine_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(get_engine())
+    return _batcher
@@ -0,0 +1,169 @@
+"""
+Shared async Fireworks AI client for InfoMary
+One pooled keep-alive HTTP client per process with per-call timeouts,
+jittered retries on 429/5xx and a cap on concurrent requests.
+"""
+
+import asyncio
+import os
+import random
+
+import httpx
+
+FIREWORKS_API_URL = "https://api.fireworks.ai/inference/v1/chat/completions"
+FIREWORKS_MODEL = "accounts/fireworks/models/kimi-k2-instruct-0905"
+
+FIREWORKS_TIMEOUT = float(os.environ.get("FIREWORKS_TIMEOUT", "30"))
+FIREWORKS_CONNECT_TIMEOUT = float(os.environ.get("FIREWORKS_CONNECT_TIMEOUT", "5"))
+FIREWORKS_MAX_RETRIES = int(os.environ.get("FIREWORKS_MAX_RETRIES", "3"))
+FIREWORKS_MAX_CONCURRENCY = int(os.environ.get("FIREWORKS_MAX_CONCURRENCY", "16"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+
+class FireworksError(Exception):
+    """Raised by streaming calls when the request cannot be completed"""
+
+
+class FireworksClient:
+    """Pooled async client for the Fireworks chat completions API"""
+
+    def __init__(self, api_key=None, url=FIREWORKS_API_URL, model=FIREWORKS_MODEL,
+                 timeout=FIREWORKS_TIMEOUT, max_retries=FIREWORKS_MAX_RETRIES,
+                 max_concurrency=FIREWORKS_MAX_CONCURRENCY):
+        self.api_key = api_key if api_key is not None else os.environ.get("FIREWORKS_API_KEY")
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _ensure_client(self):
+        # httpx pools and asyncio semaphores are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=FIREWORKS_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60,
+                ),
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}",
+                },
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _payload(self, messages, temperature, max_tokens, stream):
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "top_p": 1,
+            "top_k": 40,
+            "presence_penalty": 0,
+            "frequency_penalty": 0,
+            "temperature": temperature,
+            "messages": messages,
+            "stream": stream,
+        }
+
+    @staticmethod
+    def _retry_delay(attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), RETRY_MAX_DELAY)
+                except ValueError:
+                    pass
+        # Full jitter keeps concurrent sessions from retrying in lockstep
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+    async def chat(self, messages, temperature=0.6, max_tokens=3000, timeout=None):
+        """Non-streaming completion; returns the JSON body or an {'error': ...} dict"""
+        client = self._ensure_client()
+        payload = self._payload(messages, temperature, max_tokens, stream=False)
+        request_timeout = httpx.Timeout(timeout or self.timeout, connect=FIREWORKS_CONNECT_TIMEOUT)
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    response = await client.post(self.url, json=payload, timeout=request_timeout)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    print(f"⚠️ Fireworks API returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+                    await asyncio.sleep(self._retry_delay(attempt, response))
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except httpx.TransportError as e:
+                if attempt < self.max_retries:
+                    print(f"⚠️ Fireworks API transport error: {e!r}, retrying ({attempt + 1}/{self.max_retries})")
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                print(f"❌ Fireworks API request error: {e!r}")
+                return {"error": {"message": str(e) or repr(e), "type": "request_error"}}
+            except httpx.HTTPStatusError as e:
+                print(f"❌ Fireworks API request error: {e}")
+                return {"error": {"message": str(e), "type": "request_error"}}
+            except Exception as e:
+                print(f"❌ Unexpected error in API call: {e}")
+                return {"error": {"message": str(e), "type": "unknown_error"}}
+
+    async def stream_lines(self, messages, temperature=0.6, max_tokens=3000, timeout=None):
+        """
+        Streaming completion; yields raw response lines.
+        Retries only happen before the first byte is received.
+        """
+        client = self._ensure_client()
+        payload = self._payload(messages, temperature, max_tokens, stream=True)
+        request_timeout = httpx.Timeout(timeout or self.timeout, connect=FIREWORKS_CONNECT_TIMEOUT)
+
+        started = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    async with client.stream("POST", self.url, json=payload, timeout=request_timeout) as response:
+                        if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            print(f"⚠️ Fireworks stream returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+                            delay = self._retry_delay(attempt, response)
+                        else:
+                            if response.is_error:
+                                await response.aread()
+                                raise FireworksError(f"Fireworks API error {response.status_code}: {response.text[:200]}")
+                            async for line in response.aiter_lines():
+                                started = True
+                                yield line
+                            return
+            except httpx.TransportError as e:
+                if started or attempt >= self.max_retries:
+                    raise FireworksError(f"Fireworks API request error: {e!r}") from e
+                print(f"⚠️ Fireworks stream transport error: {e!r}, retrying ({attempt + 1}/{self.max_retries})")
+                delay = self._retry_delay(attempt)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_client = None
+
+
+def get_fireworks_client():
+    """Return the process-wide FireworksClient"""
+    global _client
+    if _client is None:
+        _client = FireworksClient()
+    return _client
@@ -0,0 +1,156 @@
+"""
+Bulk knowledge-base ingestion for InfoMary
+Walks a folder of DOCX / Markdown / text / HTML files, parses and chunks them across a
+process pool, and streams the chunks into the MATZ_Health_Bot collection in batches.
+
+Usage:
+    python ingest.py path/to/documents [--workers 4] [--no-prune]
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from dotenv import load_dotenv
+from embeddings import get_engine
+from populate_db import CHUNK_SIZE, EMBED_BATCH_SIZE, IncrementalIndexer, make_chunks
+
+load_dotenv()
+
+SOURCE_PREFIX = "kb/"
+SUPPORTED_EXTENSIONS = {".docx", ".md", ".markdown", ".txt", ".html", ".htm"}
+REPORT_EVERY = 5.0  # seconds between progress lines
+
+
+def find_documents(root):
+    """Yield supported files under root in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def parse_docx(path):
+    import docx2txt
+    return docx2txt.process(path) or ""
+
+
+def parse_html(path):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(read_text(path), "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    # Keep block boundaries as blank lines so the chunker sees paragraphs
+    return soup.get_text("\n\n")
+
+
+def parse_markdown(path):
+    text = read_text(path)
+    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"^\s{0,3}#{1,6}\s*", "", text, flags=re.MULTILINE)
+    return re.sub(r"[*_`>]+", "", text)
+
+
+PARSERS = {
+    ".docx": parse_docx,
+    ".md": parse_markdown,
+    ".markdown": parse_markdown,
+    ".txt": read_text,
+    ".html": parse_html,
+    ".htm": parse_html,
+}
+
+
+def parse_and_chunk(path, root, max_chars=CHUNK_SIZE):
+    """Worker: parse one file and return its chunks (runs in a child process)"""
+    source = SOURCE_PREFIX + os.path.relpath(path, root).replace(os.sep, "/")
+    try:
+        text = PARSERS[os.path.splitext(path)[1].lower()](path)
+        return source, make_chunks(source, text, max_chars), None
+    except Exception as e:
+        return source, [], str(e)
+
+
+def ingest_folder(root, workers=None, prune=True, batch_size=EMBED_BATCH_SIZE, max_chars=CHUNK_SIZE):
+    """Parse every supported file under root and sync the chunks into the collection"""
+    engine = get_engine().load()
+    collection = engine.get_collection(create=True)
+    indexer = IncrementalIndexer(collection, engine, batch_size=batch_size)
+
+    workers = workers or os.cpu_count() or 1
+    # Bounded number of in-flight files keeps memory flat regardless of corpus size
+    max_in_flight = workers * 2
+    files_done = 0
+    failed = 0
+    started = time.perf_counter()
+    next_report = started + REPORT_EVERY
+
+    def report(final=False):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        label = "✅ Done" if final else "⏳ Progress"
+        print(f"{label}: {files_done} files ({files_done / elapsed:.1f} files/s), "
+              f"{indexer.stats['seen']} chunks ({indexer.stats['seen'] / elapsed:.1f} chunks/s), "
+              f"{indexer.stats['embedded']} embedded, {indexer.stats['reused']} reused, {failed} failed")
+
+    paths = find_documents(root)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(parse_and_chunk, path, root, max_chars))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                source, chunks, error = future.result()
+                files_done += 1
+                if error:
+                    failed += 1
+                    print(f"⚠️ Failed to parse {source}: {error}")
+                    continue
+                indexer.add_many(chunks)
+
+            if time.perf_counter() >= next_report:
+                report()
+                next_report = time.perf_counter() + REPORT_EVERY
+
+    stats = indexer.finish(prune=prune and not failed, prune_prefix=SOURCE_PREFIX)
+    report(final=True)
+    if failed and prune:
+        print("ℹ️ Skipped pruning because some files failed to parse")
+    print(f"📊 {stats['upserted']} upserted ({stats['embedded']} embedded, {stats['reused']} reused), "
+          f"{stats['unchanged']} unchanged, {stats['deleted']} deleted")
+    return {**stats, "files": files_done, "failed": failed, "seconds": time.perf_counter() - started}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a folder of documents into the InfoMary knowledge base")
+    parser.add_argument("folder", help="folder containing .docx, .md, .txt or .html files")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="chunks per embedding batch")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="max characters per chunk")
+    parser.add_argument("--no-prune", action="store_true", help="keep chunks for files that no longer exist")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Knowledge Base Ingestion: {args.folder}")
+    print("=" * 60)
+    ingest_folder(args.folder, workers=args.workers, prune=not args.no_prune,
+                  batch_size=args.batch_size, max_chars=args.chunk_size)
+    print("=" * 60)
@@ -0,0 +1,235 @@
+"""
+Load harness: many simulated InfoMary sessions through the real Chainlit handlers
+Every LLM call goes to a fake Fireworks client with configurable latency, so only the app's own
+concurrency behaviour is measured. Each session tags its messages ("[s0042]") and the fake
+echoes back every tag it sees in a prompt; a session that receives another session's tag means
+state leaked between sessions.
+
+Usage:
+    python load_test.py [--sessions 10 50 100 200] [--turns 5] [--llm-latency-ms 300] [--hash-embeddings]
+
+--hash-embeddings swaps MiniLM for a deterministic bag-of-words hash, for machines that can't
+download the model; retrieval quality is meaningless then, but the concurrency path is the same.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import random
+import re
+import time
+
+import numpy as np
+from chainlit.context import init_http_context
+from chainlit.emitter import BaseChainlitEmitter
+from chainlit.user import User
+
+import app
+
+TAG = re.compile(r"\[s\d{4}\]", re.IGNORECASE)
+
+OPENERS = [
+    "i have a headache and a fever",
+    "my knee hurts when i walk",
+    "i keep feeling dizzy when i stand up",
+    "what assisted living options are available for my mother",
+    "how long is the recovery after hip replacement surgery",
+]
+ANSWERS = [
+    "about three days now",
+    "it gets worse in the evening",
+    "no, i am not taking any medication",
+    "it is a dull pain, maybe five out of ten",
+    "yes, i also feel tired",
+]
+
+
+class FakeFireworksClient:
+    """Stands in for FireworksClient: same chat/stream_lines interface, canned answers, fixed latency"""
+
+    model = "fake-llm"
+
+    def __init__(self, latency, token_delay, tokens):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.calls = 0
+
+    @staticmethod
+    def _tags(messages):
+        text = "\n".join(m["content"] for m in messages)
+        return " ".join(sorted({t.lower() for t in TAG.findall(text)}))
+
+    def _answer(self, messages):
+        prompt = messages[-1]["content"]
+        tags = self._tags(messages)
+        if prompt.startswith("Assign category"):
+            return "Healthcare Services" if "assisted living" in prompt else "Medical Advice"
+        if "JSON array" in prompt:
+            return json.dumps(["yes"] * prompt.count("?"))
+        if "Respond with 'yes'" in prompt:
+            return "yes"
+        if "follow-up questions" in prompt:
+            return "\n".join(f"{i}. How long has this been going on {tags}?" for i in range(1, 4))
+        if "Update the summary" in prompt:
+            return f"Summary so far {tags}"
+        return f"Advice for {tags}: rest, drink water and see a doctor if it gets worse."
+
+    def _body(self, content):
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    async def chat(self, messages, temperature=0.6, max_tokens=3000, timeout=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._body(self._answer(messages))
+
+    async def stream_lines(self, messages, temperature=0.6, max_tokens=3000, timeout=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        words = f"Here are senior care options for {self._tags(messages)}:".split()
+        words += [f"option{i}" for i in range(self.tokens)]
+        for word in words:
+            yield "data: " + json.dumps({"choices": [{"delta": {"content": word + " "}}]})
+            yield ""
+            await asyncio.sleep(self.token_delay)
+        yield "data: [DONE]"
+        yield ""
+
+    async def aclose(self):
+        pass
+
+
+class HashEmbeddings:
+    """Deterministic stand-in for HuggingFaceEmbeddings: hashed bag of words, L2-normalized"""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def use_hash_embeddings(engine):
+    import chromadb
+    from chromadb.config import Settings
+
+    engine._model = HashEmbeddings()
+    engine._client = chromadb.PersistentClient(path=engine.db_path, settings=Settings(allow_reset=True))
+    engine._load_error = None
+    engine._ready.set()
+
+
+class RecordingEmitter(BaseChainlitEmitter):
+    """Collects what the handlers would have sent to this session's browser"""
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.outputs = {}
+
+    def set_chat_settings(self, settings):
+        # Synchronous in the real ChainlitEmitter; the base class stub is async
+        self.session.chat_settings = settings
+
+    def _record(self, step_dict):
+        if step_dict.get("type") == "assistant_message":
+            self.outputs[step_dict["id"]] = step_dict.get("output", "")
+
+    async def send_step(self, step_dict):
+        self._record(step_dict)
+
+    async def update_step(self, step_dict):
+        self._record(step_dict)
+
+    async def stream_start(self, step_dict):
+        self._record(step_dict)
+
+    async def send_token(self, id, token, is_sequence=False, is_input=False):
+        if id in self.outputs:
+            self.outputs[id] = token if is_sequence else self.outputs[id] + token
+
+
+async def run_session(index, turns, rng):
+    tag = f"[s{index:04d}]"
+    user = User(identifier=f"load-{index}@example.com", display_name=f"Load {index}",
+                metadata={"email": f"load-{index}@example.com", "provider": "load_test"})
+    context = init_http_context(user=user)
+    emitter = RecordingEmitter(context.session)
+    context.emitter = emitter
+
+    await app.setup_health_chatbot()
+    latencies = []
+    script = [rng.choice(OPENERS)] + [rng.choice(ANSWERS) for _ in range(turns - 1)]
+    for text in script:
+        message = app.cl.Message(content=f"{text} {tag}", author="You", type="user_message")
+        started = time.perf_counter()
+        await app.handle_message(message)
+        latencies.append(time.perf_counter() - started)
+
+    seen = {t.lower() for output in emitter.outputs.values() for t in TAG.findall(output)}
+    leaked = seen - {tag}
+    # A session that never saw its own tag got no LLM output at all, which would make "no leaks" vacuous
+    return latencies, leaked, tag in seen
+
+
+async def run_level(sessions, turns, seed):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_session(i, turns, rng) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    latencies = np.asarray([l for session, _, _ in results for l in session]) * 1000
+    leaks = sum(1 for _, leaked, _ in results if leaked)
+    silent = sum(1 for _, _, answered in results if not answered)
+    return {
+        "turns_per_sec": len(latencies) / elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "p99": float(np.percentile(latencies, 99)),
+        "leaks": leaks,
+        "silent": silent,
+    }
+
+
+async def main(args):
+    fake = FakeFireworksClient(args.llm_latency_ms / 1000, args.token_delay_ms / 1000, args.tokens)
+    app.fireworks_client = fake
+    # Semantic answer hits are shared across sessions by design; disable them so tags stay per session
+    app.answer_cache.threshold = 2.0
+    if args.hash_embeddings:
+        use_hash_embeddings(app.embedding_engine)
+        # Hashed vectors can't classify; route every request through the fake LLM's classifier
+        app.request_classifier.threshold = 2.0
+    app.embedding_engine.wait_until_ready()
+
+    print("=" * 81)
+    print(f"{'sessions':>8} | {'turns/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'leaking':>8} | {'silent':>8}")
+    print("-" * 81)
+    for sessions in args.sessions:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await run_level(sessions, args.turns, args.seed)
+        print(f"{sessions:>8} | {result['turns_per_sec']:>8.1f} | {result['p50']:>8.0f} | "
+              f"{result['p95']:>8.0f} | {result['p99']:>8.0f} | {result['leaks']:>8} | {result['silent']:>8}")
+    print("=" * 81)
+    print(f"{fake.calls} fake LLM calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through InfoMary")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--token-delay-ms", type=float, default=5)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hash-embeddings", action="store_true",
+                        help="use a hashed bag-of-words embedding instead of downloading MiniLM")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""
+Turn pipeline helpers for InfoMary
+- TurnTimer:    records when each concurrent stage ran and the turn's critical-path latency
+- cancel_tasks: cancel speculative work that turned out to be unneeded
+"""
+
+import asyncio
+import time
+
+
+class TurnTimer:
+    """Per-turn stage spans; critical path = turn start until the first user-visible output"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans = {}
+        self.marks = {}
+        self.cancelled = []
+
+    async def timed(self, name, coro):
+        """Await coro, recording its start/end relative to the turn"""
+        start = time.perf_counter()
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        finally:
+            self.spans[name] = (start - self.started_at, time.perf_counter() - self.started_at)
+
+    def task(self, name, coro):
+        return asyncio.create_task(self.timed(name, coro))
+
+    def mark(self, name, at=None):
+        if name not in self.marks:
+            self.marks[name] = (at or time.perf_counter()) - self.started_at
+
+    @property
+    def critical_path_ms(self):
+        end = self.marks.get("first_output", time.perf_counter() - self.started_at)
+        return end * 1000
+
+    def report(self):
+        spans = " | ".join(
+            f"{name} {start * 1000:.0f}-{end * 1000:.0f}ms" + (" (cancelled)" if name in self.cancelled else "")
+            for name, (start, end) in sorted(self.spans.items(), key=lambda item: item[1][0])
+        )
+        total = (time.perf_counter() - self.started_at) * 1000
+        marks = "".join(f" | {name} {at * 1000:.0f} ms" for name, at in self.marks.items() if name != "first_output")
+        return f"critical path {self.critical_path_ms:.0f} ms{marks} | total {total:.0f} ms | {spans}"
+
+
+async def cancel_tasks(*tasks):
+    """Cancel tasks that are still running and wait for them to unwind"""
+    pending = [t for t in tasks if t is not None and not t.done()]
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
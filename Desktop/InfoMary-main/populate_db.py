@@ -1,21 +1,29 @@
 """
 Script to populate ChromaDB with health information
-Run this ONCE to create and populate your vector database
+Default mode is incremental: only new or changed chunks are embedded, stale ones are deleted.
+Use --rebuild to drop and recreate the collection from scratch (ingest.py must be run again
+afterwards), or --rebuild-builtin to re-embed only this script's own chunks and keep ingest.py's.
 """
 
+import argparse
+import hashlib
+import re
+import time
+
 from dotenv import load_dotenv
-import chromadb
-from chromadb.config import Settings
-from langchain_huggingface import HuggingFaceEmbeddings
+from embeddings import get_engine, COLLECTION_NAME, COLLECTION_METADATA
+from retrieval_cache import bump_kb_version
+from categories import CategoryTagger
 
 load_dotenv()
 
-# Initialize ChromaDB
-db = chromadb.PersistentClient(path="./db", settings=Settings(allow_reset=True))
-collection_name = "MATZ_Health_Bot"
+collection_name = COLLECTION_NAME
 
-# Initialize embedding model
-embedding_model = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+# Chunking / batching
+CHUNK_SIZE = 1000          # max characters per chunk
+EMBED_BATCH_SIZE = 64      # chunks per embed_documents + upsert call
+BUILTIN_SOURCE_PREFIX = "health_documents/"
+LEGACY_ID_PREFIX = "doc_"  # ids written by the old drop-and-recreate script
 
 # Sample health data (replace with your actual data)
 health_documents = [
@@ -31,38 +39,270 @@ health_documents = [
     "Respite care provides temporary relief for family caregivers while ensuring continued care for their loved ones.",
 ]
 
-def populate_database():
-    """Populate ChromaDB with health information"""
-    print("🔄 Starting database population...")
+def split_into_chunks(text, max_chars=CHUNK_SIZE):
+    """Greedily pack paragraphs (then sentences) into chunks of at most max_chars"""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > max_chars:
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence:
+                pieces.append(sentence)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def make_chunks(source, text, max_chars=CHUNK_SIZE):
+    """Chunk one source into records with stable ids (source#index) and content hashes"""
+    return [
+        {
+            "id": f"{source}#{i}",
+            "document": chunk,
+            "metadata": {"source": source, "chunk": i, "content_hash": content_hash(chunk)},
+        }
+        for i, chunk in enumerate(split_into_chunks(text, max_chars))
+    ]
+
+
+class IncrementalIndexer:
+    """
+    Sync chunks into a live collection by stable id.
+    Unchanged chunks are skipped, new/changed ones are embedded in batches and upserted,
+    and (with prune) ids that were not seen this run are deleted at the end.
+    Ids are positional, so an edit near the top of a source shifts every later chunk to a new
+    id; a chunk whose content is already in the collection reuses that embedding instead of
+    being embedded again, so embedding cost follows the size of the edit.
+    """
+
+    def __init__(self, collection, engine, batch_size=EMBED_BATCH_SIZE):
+        self.collection = collection
+        self.engine = engine
+        self.batch_size = batch_size
+        self.tagger = CategoryTagger(engine)
+        self.by_hash = {}     # content_hash -> an id already holding that content's embedding
+        self._displaced = {}  # content_hash -> embedding of content overwritten earlier this run
+        self.existing = self._load_existing_hashes()
+        self.seen = set()
+        self._pending = []
+        self.stats = {"seen": 0, "unchanged": 0, "upserted": 0, "embedded": 0, "reused": 0,
+                      "deleted": 0, "batches": 0}
+
+    def _load_existing_hashes(self, page_size=5000):
+        existing = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            for doc_id, metadata in zip(ids, page.get("metadatas") or [None] * len(ids)):
+                metadata = metadata or {}
+                # Chunks indexed before category tagging existed are treated as changed
+                existing[doc_id] = metadata.get("content_hash") if "category" in metadata else None
+                if existing[doc_id]:
+                    self.by_hash.setdefault(existing[doc_id], doc_id)
+            if len(ids) < page_size:
+                return existing
+            offset += page_size
+
+    def add(self, chunk):
+        self.seen.add(chunk["id"])
+        self.stats["seen"] += 1
+        if self.existing.get(chunk["id"]) == chunk["metadata"]["content_hash"]:
+            self.stats["unchanged"] += 1
+            return
+        self._pending.append(chunk)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+
+    def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        documents = [c["document"] for c in batch]
+        embeddings = self._reused_embeddings(batch)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for i, embedding in zip(missing, self.engine.embed_documents([documents[i] for i in missing])):
+                embeddings[i] = embedding
+        self.stats["embedded"] += len(missing)
+        self.stats["reused"] += len(batch) - len(missing)
+        for c, category in zip(batch, self.tagger.tag(embeddings)):
+            c["metadata"]["category"] = category
+        self.collection.upsert(
+            ids=[c["id"] for c in batch],
+            documents=documents,
+            metadatas=[c["metadata"] for c in batch],
+            embeddings=embeddings,
+        )
+        for c in batch:
+            self.existing[c["id"]] = c["metadata"]["content_hash"]
+            self.by_hash[c["metadata"]["content_hash"]] = c["id"]
+        self.stats["upserted"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _reused_embeddings(self, batch):
+        """
+        Embeddings of chunks whose content is already stored, else None. Ids this batch is about
+        to overwrite have their old embedding kept aside, since a later batch may need that content.
+        """
+        overwritten = {c["id"]: self.existing[c["id"]] for c in batch
+                       if self.existing.get(c["id"]) not in (None, c["metadata"]["content_hash"])}
+        donors = {c["id"]: self.by_hash.get(c["metadata"]["content_hash"]) for c in batch
+                  if c["metadata"]["content_hash"] not in self._displaced}
+        wanted = sorted({d for d in donors.values() if d is not None} | set(overwritten))
+        found = {}
+        if wanted:
+            page = self.collection.get(ids=wanted, include=["embeddings"])
+            for doc_id, embedding in zip(page.get("ids") or [], page.get("embeddings") or []):
+                found[doc_id] = list(embedding)
+        for doc_id, old_hash in overwritten.items():
+            if doc_id in found:
+                self._displaced[old_hash] = found[doc_id]
+            if self.by_hash.get(old_hash) == doc_id:
+                del self.by_hash[old_hash]
+        return [self._displaced.get(c["metadata"]["content_hash"]) or found.get(donors.get(c["id"]))
+                for c in batch]
+
+    def finish(self, prune=True, prune_prefix=None):
+        """Flush remaining chunks, delete unseen ids, and signal running bots if anything changed"""
+        self.flush()
+        if prune:
+            stale = [
+                doc_id for doc_id in self.existing
+                if doc_id not in self.seen and (prune_prefix is None or doc_id.startswith(prune_prefix))
+            ]
+            for i in range(0, len(stale), self.batch_size * 16):
+                self.collection.delete(ids=stale[i:i + self.batch_size * 16])
+            for doc_id in stale:
+                del self.existing[doc_id]
+            self.stats["deleted"] = len(stale)
+        if self.stats["upserted"] or self.stats["deleted"]:
+            bump_kb_version()
+        return self.stats
+
+
+def sync_database(sources, prune=True, prune_prefix=None):
+    """Incrementally sync {source_name: text} into the collection without recreating it"""
+    engine = get_engine().load()
+    collection = engine.get_collection(create=True)
+    indexer = IncrementalIndexer(collection, engine)
+    for source, text in sources.items():
+        indexer.add_many(make_chunks(source, text))
+    return indexer.finish(prune=prune, prune_prefix=prune_prefix)
+
+
+def delete_builtin_chunks(collection):
+    """Delete only this script's ids - chunks loaded by ingest.py (kb/...) are kept"""
+    own_prefixes = (BUILTIN_SOURCE_PREFIX, LEGACY_ID_PREFIX)
+    own_ids, offset, page_size = [], 0, 5000
+    while True:
+        page_ids = collection.get(include=[], limit=page_size, offset=offset).get("ids") or []
+        own_ids.extend(doc_id for doc_id in page_ids if doc_id.startswith(own_prefixes))
+        if len(page_ids) < page_size:
+            break
+        offset += page_size
+    for i in range(0, len(own_ids), EMBED_BATCH_SIZE * 16):
+        collection.delete(ids=own_ids[i:i + EMBED_BATCH_SIZE * 16])
+    print(f"🗑️  Deleted {len(own_ids)} built-in chunks from collection: {collection_name}")
+
+
+def rebuild_database(builtin_only=False):
+    """
+    Drop and recreate the collection, then embed every document. Recovers a corrupted
+    collection or one with the wrong embedding dimension; ingest.py has to be re-run afterwards.
+    With builtin_only, the collection is kept and only this script's chunks are re-embedded.
+    """
+    engine = get_engine().load()
+    db = engine.client
     
-    try:
+    if builtin_only:
+        collection = engine.get_collection(create=True)
+        delete_builtin_chunks(collection)
+    else:
         # Delete existing collection if it exists
         try:
             db.delete_collection(collection_name)
             print(f"🗑️  Deleted existing collection: {collection_name}")
-        except:
-            print(f"ℹ️  No existing collection to delete")
+        except Exception:
+            print("ℹ️  No existing collection to delete")
         
         # Create new collection
         collection = db.create_collection(
             name=collection_name,
-            metadata={"description": "Health bot knowledge base"}
+            metadata=COLLECTION_METADATA
         )
+        engine.reset_collection()
         print(f"✅ Created collection: {collection_name}")
-        
-        # Generate embeddings
-        print("🔄 Generating embeddings...")
-        embeddings = [embedding_model.embed_query(doc) for doc in health_documents]
-        
-        # Add documents to collection
+        print("ℹ️  Chunks loaded by ingest.py were dropped too - run ingest.py again to restore them")
+    
+    # Generate embeddings
+    print("🔄 Generating embeddings...")
+    tagger = CategoryTagger(engine)
+    chunks = [c for source, text in builtin_sources().items() for c in make_chunks(source, text)]
+    for i in range(0, len(chunks), EMBED_BATCH_SIZE):
+        batch = chunks[i:i + EMBED_BATCH_SIZE]
+        documents = [c["document"] for c in batch]
+        embeddings = engine.embed_documents(documents)
+        for c, category in zip(batch, tagger.tag(embeddings)):
+            c["metadata"]["category"] = category
         collection.add(
             embeddings=embeddings,
-            documents=health_documents,
-            ids=[f"doc_{i}" for i in range(len(health_documents))]
+            documents=documents,
+            metadatas=[c["metadata"] for c in batch],
+            ids=[c["id"] for c in batch]
         )
+    
+    # Tell running bots to drop cached retrieval results
+    bump_kb_version()
+    print(f"✅ Successfully added {len(chunks)} chunks to the database!")
+    return collection
+
+
+def builtin_sources():
+    return {f"{BUILTIN_SOURCE_PREFIX}{i}": doc for i, doc in enumerate(health_documents)}
+
+
+def populate_database(rebuild=False, builtin_only=False):
+    """Populate ChromaDB with health information"""
+    print("🔄 Starting database population...")
+    started = time.perf_counter()
+    
+    try:
+        if rebuild:
+            collection = rebuild_database(builtin_only=builtin_only)
+        else:
+            # Only prune our own sources - chunks loaded by ingest.py are left alone
+            stats = sync_database(builtin_sources(), prune_prefix=(BUILTIN_SOURCE_PREFIX, LEGACY_ID_PREFIX))
+            collection = get_engine().get_collection()
+            print(f"✅ Incremental sync: {stats['upserted']} upserted ({stats['embedded']} embedded, "
+                  f"{stats['reused']} reused), {stats['unchanged']} unchanged, "
+                  f"{stats['deleted']} deleted in {stats['batches']} batches")
         
-        print(f"✅ Successfully added {len(health_documents)} documents to the database!")
-        print(f"📊 Collection '{collection_name}' is ready to use!")
+        print(f"📊 Collection '{collection_name}' is ready to use! ({time.perf_counter() - started:.2f}s)")
         
         # Verify
         count = collection.count()
@@ -73,10 +313,17 @@ def populate_database():
         raise
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the InfoMary knowledge base")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="drop and recreate the whole collection (re-run ingest.py afterwards)")
+    parser.add_argument("--rebuild-builtin", action="store_true",
+                        help="re-embed only the built-in documents, keeping chunks loaded by ingest.py")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("ChromaDB Population Script")
     print("=" * 60)
-    populate_database()
+    populate_database(rebuild=args.rebuild or args.rebuild_builtin, builtin_only=args.rebuild_builtin and not args.rebuild)
     print("=" * 60)
     print("✨ Done! You can now run your chatbot with: python app.py")
     print("=" * 60)
\ No newline at end of file
@@ -47,6 +47,38 @@ audioObserver.observe(document.body, {
     subtree: true 
 });
 
+// ============================================
+// SEQUENTIAL AUDIO PLAYBACK
+// ============================================
+
+// Pipelined read-aloud sends one auto-playing clip per sentence, in order.
+// Hold each new clip until the one before it has finished.
+const audioQueue = [];
+let currentAudio = null;
+
+function playNextAudio() {
+    currentAudio = audioQueue.shift() || null;
+    if (currentAudio) {
+        currentAudio.play().catch(() => playNextAudio());
+    }
+}
+
+document.addEventListener('play', (e) => {
+    const audio = e.target;
+    if (!(audio instanceof HTMLAudioElement) || audio === currentAudio) return;
+    const busy = currentAudio && currentAudio.isConnected && !currentAudio.paused && !currentAudio.ended;
+    if (busy) {
+        audio.pause();
+        if (!audioQueue.includes(audio)) audioQueue.push(audio);
+    } else {
+        currentAudio = audio;
+    }
+}, true);
+
+document.addEventListener('ended', (e) => {
+    if (e.target === currentAudio) playNextAudio();
+}, true);
+
 // ============================================
 // HIDE CHAINLIT BRANDING
 // ============================================
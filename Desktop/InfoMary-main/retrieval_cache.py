@@ -0,0 +1,138 @@
+"""
+Query-embedding and retrieval-result cache for InfoMary
+Bounded LRU + TTL, keyed by normalized query text, invalidated when the knowledge base is rebuilt
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from embeddings import DB_PATH
+
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_TTL = float(os.environ.get("RETRIEVAL_CACHE_TTL", "3600"))
+
+# populate_db rewrites this file whenever the MATZ_Health_Bot collection changes
+KB_VERSION_FILE = os.path.join(DB_PATH, "kb_version")
+KB_VERSION_CHECK_INTERVAL = 1.0
+
+
+def normalize_query(text):
+    """Lowercase, collapse whitespace and drop surrounding punctuation"""
+    text = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    return text.strip(" .,!?;:'\"")
+
+
+def bump_kb_version():
+    """Mark the knowledge base as changed so every process drops cached results"""
+    os.makedirs(os.path.dirname(KB_VERSION_FILE) or ".", exist_ok=True)
+    with open(KB_VERSION_FILE, "w") as f:
+        f.write(str(time.time_ns()))
+
+
+def current_kb_version():
+    try:
+        return os.stat(KB_VERSION_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_size=RETRIEVAL_CACHE_SIZE, ttl=RETRIEVAL_CACHE_TTL):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class RetrievalCache:
+    """Embedding + top-k result cache in front of retrieve_relevant_context"""
+
+    def __init__(self, max_size=RETRIEVAL_CACHE_SIZE, ttl=RETRIEVAL_CACHE_TTL, on_invalidate=None):
+        # Embeddings depend only on the model, so they survive knowledge-base rebuilds
+        self.embeddings = LRUTTLCache(max_size, ttl)
+        self.results = LRUTTLCache(max_size, ttl)
+        self.on_invalidate = on_invalidate
+        self._kb_version = current_kb_version()
+        self._next_version_check = 0.0
+
+    def _check_kb_version(self):
+        now = time.monotonic()
+        if now < self._next_version_check:
+            return
+        self._next_version_check = now + KB_VERSION_CHECK_INTERVAL
+        version = current_kb_version()
+        if version != self._kb_version:
+            self._kb_version = version
+            self.invalidate()
+
+    def invalidate(self):
+        self.results.clear()
+        print("🗑️ Retrieval cache invalidated (knowledge base changed)")
+        if self.on_invalidate:
+            self.on_invalidate()
+
+    def get_embedding(self, query):
+        return self.embeddings.get(normalize_query(query))
+
+    def put_embedding(self, query, embedding):
+        self.embeddings.put(normalize_query(query), embedding)
+
+    def get_results(self, query, params):
+        """params: anything else the result depends on, e.g. (top_k, category)"""
+        self._check_kb_version()
+        cached = self.results.get((normalize_query(query), params))
+        return list(cached) if cached is not None else None
+
+    def put_results(self, query, params, documents):
+        self.results.put((normalize_query(query), params), tuple(documents))
+
+    def stats(self):
+        return {"embeddings": self.embeddings.stats(), "results": self.results.stats()}
@@ -0,0 +1,338 @@
+"""
+Streaming speech-to-text for InfoMary
+- EnergyVAD:           frame-energy voice activity detection over 16-bit PCM
+- PCMDecoder:          pipes a compressed recording (Chainlit's audio/webm) through ffmpeg as it
+                       arrives and hands back 16-bit mono PCM
+- StreamingTranscription: buffers incoming audio chunks in memory and transcribes each finished
+                       utterance while the user is still talking
+- Transcribers:        OpenAI Whisper or a local stub (STT_BACKEND), so tests need no API key
+
+Raw PCM goes straight to the VAD. webm/ogg chunks can't be decoded one by one, so they are fed to
+a single long-running ffmpeg process instead; without ffmpeg (or if it fails) the recording falls
+back to one Whisper call on the whole buffer at audio end.
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import time
+import wave
+
+import numpy as np
+
+STT_BACKEND = os.environ.get("STT_BACKEND", "openai")
+STT_MODEL = os.environ.get("STT_MODEL", "whisper-1")
+STT_SAMPLE_RATE = int(os.environ.get("STT_SAMPLE_RATE", "24000"))  # [features.audio] sample_rate
+VAD_THRESHOLD_DB = float(os.environ.get("VAD_THRESHOLD_DB", "-45"))  # [features.audio] min_decibels
+VAD_FRAME_MS = 30
+# Pause that closes a segment - shorter than the UI's silence_timeout so segments finish mid-utterance
+VAD_SILENCE_MS = int(os.environ.get("VAD_SILENCE_MS", "500"))
+VAD_MIN_SPEECH_MS = int(os.environ.get("VAD_MIN_SPEECH_MS", "250"))
+# Audio kept before speech onset so the first syllable isn't clipped
+VAD_PREROLL_MS = 150
+# Decoder for compressed recordings; unset and not on PATH means one-shot transcription
+FFMPEG_PATH = os.environ.get("FFMPEG_PATH") or shutil.which("ffmpeg")
+
+
+def is_pcm(mime_type):
+    """Only raw PCM can be segmented as it streams; webm/ogg chunks aren't independently decodable"""
+    mime_type = (mime_type or "").lower()
+    return "pcm" in mime_type or "l16" in mime_type
+
+
+def pcm_to_wav(pcm, sample_rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+# ----------------------------------------------------------------------
+# Transcription backends
+# ----------------------------------------------------------------------
+
+class OpenAITranscriber:
+    """Whisper over the OpenAI API"""
+
+    def __init__(self, client, model=STT_MODEL):
+        self.client = client
+        self.model = model
+
+    async def transcribe(self, name, audio, mime_type):
+        response = await self.client.audio.transcriptions.create(
+            model=self.model, file=(name, audio, mime_type)
+        )
+        return response.text
+
+
+class StubTranscriber:
+    """Local stand-in: returns fixed text, or text(name, audio, mime_type) when given a callable"""
+
+    def __init__(self, text="[speech]", delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    async def transcribe(self, name, audio, mime_type):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.text(name, audio, mime_type) if callable(self.text) else self.text
+
+
+def get_transcriber(openai_client=None, backend=STT_BACKEND):
+    if backend == "stub":
+        return StubTranscriber()
+    if openai_client is None:
+        return None
+    return OpenAITranscriber(openai_client)
+
+
+# ----------------------------------------------------------------------
+# Voice activity detection
+# ----------------------------------------------------------------------
+
+class EnergyVAD:
+    """Cut a 16-bit mono PCM stream into utterances at pauses"""
+
+    def __init__(self, sample_rate=STT_SAMPLE_RATE, threshold_db=VAD_THRESHOLD_DB, frame_ms=VAD_FRAME_MS,
+                 silence_ms=VAD_SILENCE_MS, min_speech_ms=VAD_MIN_SPEECH_MS, preroll_ms=VAD_PREROLL_MS):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.preroll_frames = preroll_ms // frame_ms
+        self._pending = bytearray()  # bytes not yet forming a whole frame
+        self._frames = []            # current segment (pre-roll included)
+        self._speech_frames = 0
+        self._silent_run = 0
+        self.segments = 0
+
+    def frame_db(self, frame):
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+        rms = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        return 20 * np.log10(rms) if rms > 0 else -120.0
+
+    def feed(self, pcm):
+        """Add PCM bytes, return the segments that have just ended"""
+        self._pending.extend(pcm)
+        finished = []
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+            segment = self._on_frame(frame)
+            if segment:
+                finished.append(segment)
+        return finished
+
+    def _on_frame(self, frame):
+        voiced = self.frame_db(frame) >= self.threshold_db
+        self._frames.append(frame)
+        if not self._speech_frames:
+            if voiced:
+                self._speech_frames = 1
+            else:
+                # Still waiting for speech: keep only the pre-roll
+                del self._frames[:-self.preroll_frames or len(self._frames)]
+            return None
+
+        if voiced:
+            self._speech_frames += 1
+            self._silent_run = 0
+            return None
+        self._silent_run += 1
+        if self._silent_run >= self.silence_frames:
+            return self._cut()
+        return None
+
+    def _cut(self):
+        frames, speech = self._frames, self._speech_frames
+        self._frames, self._speech_frames, self._silent_run = [], 0, 0
+        if speech < self.min_speech_frames:
+            return None  # a click or a cough
+        self.segments += 1
+        return b"".join(frames)
+
+    def flush(self):
+        """Close whatever is in progress at end of stream"""
+        if self._pending:
+            self._frames.append(bytes(self._pending))
+            self._pending.clear()
+        return self._cut() if self._speech_frames else None
+
+
+# ----------------------------------------------------------------------
+# Compressed audio decoding
+# ----------------------------------------------------------------------
+
+class PCMDecoder:
+    """
+    One ffmpeg process per recording: compressed chunks go in on stdin as they arrive and
+    16-bit mono PCM comes out on stdout, so the VAD sees the audio while it is being recorded.
+    """
+
+    def __init__(self, sample_rate, on_pcm, ffmpeg=FFMPEG_PATH):
+        self.sample_rate = sample_rate
+        self.on_pcm = on_pcm
+        self.ffmpeg = ffmpeg
+        self.failed = False
+        self.decoded_bytes = 0
+        self._chunks = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    def feed(self, data):
+        self._chunks.put_nowait(bytes(data))
+
+    async def close(self):
+        """Signal end of input and wait until everything has been decoded; True on success"""
+        self._chunks.put_nowait(None)
+        await self._task
+        return not self.failed and self.decoded_bytes > 0
+
+    async def cancel(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.ffmpeg, "-loglevel", "error", "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(self.sample_rate), "pipe:1",
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            reader = asyncio.create_task(self._read(process.stdout))
+            try:
+                while (chunk := await self._chunks.get()) is not None:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+                process.stdin.close()
+                await reader
+            finally:
+                reader.cancel()
+            if await process.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with {process.returncode}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Audio decoding failed, transcribing the whole recording instead: {e}")
+            self.failed = True
+        finally:
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    async def _read(self, stdout):
+        while data := await stdout.read(4096):
+            self.decoded_bytes += len(data)
+            self.on_pcm(data)
+
+
+# ----------------------------------------------------------------------
+# Per-recording transcription
+# ----------------------------------------------------------------------
+
+class StreamingTranscription:
+    """
+    One recording. Audio is segmented by the VAD (after decoding, for webm/ogg) and each
+    segment is transcribed as soon as it ends, so by the time the user stops talking only the
+    last segment is outstanding. Without a decoder the buffer is transcribed once at the end.
+    """
+
+    def __init__(self, transcriber, mime_type, sample_rate=STT_SAMPLE_RATE, ffmpeg=FFMPEG_PATH):
+        self.transcriber = transcriber
+        self.mime_type = mime_type or "audio/webm"
+        self.sample_rate = sample_rate
+        self.pcm_input = is_pcm(self.mime_type)
+        # Must be built inside the event loop: the decoder starts ffmpeg right away
+        self.decoder = None if self.pcm_input or not ffmpeg else PCMDecoder(sample_rate, self._on_pcm, ffmpeg)
+        self.streaming = self.pcm_input or self.decoder is not None
+        self.vad = EnergyVAD(sample_rate) if self.streaming else None
+        self.buffer = bytearray()
+        self._tasks = []
+        self.started_at = time.perf_counter()
+        self.ended_at = None
+        self.ready_at = None
+
+    @property
+    def name(self):
+        return "input_audio." + ("wav" if self.pcm_input else self.mime_type.split("/")[-1].split(";")[0])
+
+    @property
+    def audio(self):
+        """The whole recording in a form the UI (and Whisper) can play"""
+        return pcm_to_wav(bytes(self.buffer), self.sample_rate) if self.pcm_input else bytes(self.buffer)
+
+    @property
+    def audio_mime_type(self):
+        return "audio/wav" if self.pcm_input else self.mime_type
+
+    def add_chunk(self, data):
+        self.buffer.extend(data)
+        if self.decoder:
+            self.decoder.feed(data)
+        elif self.pcm_input:
+            self._on_pcm(data)
+
+    def _on_pcm(self, pcm):
+        for segment in self.vad.feed(pcm):
+            self._transcribe_segment(segment)
+
+    def _transcribe_segment(self, pcm):
+        index = len(self._tasks)
+        wav = pcm_to_wav(pcm, self.sample_rate)
+        self._tasks.append(asyncio.create_task(
+            self.transcriber.transcribe(f"segment_{index}.wav", wav, "audio/wav")
+        ))
+
+    async def finish(self):
+        """Wait for the outstanding transcriptions and return the full transcript"""
+        self.ended_at = time.perf_counter()
+        if self.decoder and not await self.decoder.close():
+            # Segments cut from a broken decode can't be trusted; start over from the raw buffer
+            await self.cancel()
+            self.streaming = False
+        if self.streaming:
+            last = self.vad.flush()
+            if last:
+                self._transcribe_segment(last)
+        elif self.buffer:
+            self._tasks.append(asyncio.create_task(
+                self.transcriber.transcribe(self.name, bytes(self.buffer), self.mime_type)
+            ))
+
+        texts = []
+        for task in self._tasks:
+            try:
+                texts.append((await task).strip())
+            except Exception as e:
+                print(f"❌ Speech-to-text error: {e}")
+        self.ready_at = time.perf_counter()
+        return " ".join(t for t in texts if t)
+
+    async def cancel(self):
+        if self.decoder:
+            await self.decoder.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def transcript_lag_ms(self):
+        """Time between the end of the recording and the transcript being ready"""
+        if self.ready_at is None or self.ended_at is None:
+            return None
+        return (self.ready_at - self.ended_at) * 1000
+
+    def __str__(self):
+        lag = self.transcript_lag_ms
+        mode = f"{len(self._tasks)} VAD segments" if self.streaming else f"one-shot {self.mime_type}"
+        return (f"{len(self.buffer) / 1024:.0f} KB, {mode} | transcript ready "
+                f"{f'{lag:.0f} ms' if lag is not None else 'n/a'} after speech ended")
@@ -0,0 +1,266 @@
+"""
+Async token streaming helpers for InfoMary
+- iter_sse_deltas: incremental Server-Sent Events parser over an async line iterator
+- TokenCoalescer:  batches tiny deltas into fewer UI updates (time or size threshold)
+- StreamStats:     time-to-first-token and tokens/sec per response
+- LineDeduplicator: drops repeated lines and renumbers list items while the response streams
+- replay_text:     feed an already-known answer (e.g. a cache hit) through the same streaming path
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+
+STREAM_FLUSH_INTERVAL = float(os.environ.get("STREAM_FLUSH_INTERVAL_MS", "50")) / 1000
+STREAM_FLUSH_CHARS = int(os.environ.get("STREAM_FLUSH_CHARS", "64"))
+
+
+class StreamStats:
+    """Latency metrics for one streamed response"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.deltas = 0
+        self.completion_tokens = None  # from the API's usage block, when provided
+        self.flushes = 0
+
+    def on_delta(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.deltas += 1
+
+    def finish(self):
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+        return self
+
+    @property
+    def ttft_ms(self):
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at) * 1000
+
+    @property
+    def tokens(self):
+        return self.completion_tokens if self.completion_tokens is not None else self.deltas
+
+    @property
+    def tokens_per_sec(self):
+        if self.first_token_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.perf_counter()) - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        total = ((self.finished_at or time.perf_counter()) - self.started_at) * 1000
+        return {
+            "ttft_ms": round(self.ttft_ms, 1) if self.ttft_ms is not None else None,
+            "total_ms": round(total, 1),
+            "tokens": self.tokens,
+            "tokens_per_sec": round(self.tokens_per_sec, 1),
+            "ui_flushes": self.flushes,
+        }
+
+    def __str__(self):
+        d = self.as_dict()
+        return (f"TTFT {d['ttft_ms']} ms | {d['tokens']} tokens @ {d['tokens_per_sec']} tok/s | "
+                f"{d['ui_flushes']} UI flushes | total {d['total_ms']} ms")
+
+
+async def iter_sse_deltas(lines, stats=None):
+    """
+    Parse an OpenAI-style SSE stream incrementally and yield content deltas.
+    Handles multi-line data fields, comments and the [DONE] sentinel.
+    """
+    data_lines = []
+    async for line in lines:
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip(" "))
+            continue
+        if line.strip() or not data_lines:
+            continue
+
+        # Blank line terminates the event
+        data, data_lines = "\n".join(data_lines), []
+        if data.strip() == "[DONE]":
+            break
+        delta = _parse_event(data, stats)
+        if delta:
+            yield delta
+    else:
+        # Stream ended without a trailing blank line
+        if data_lines:
+            data = "\n".join(data_lines)
+            if data.strip() != "[DONE]":
+                delta = _parse_event(data, stats)
+                if delta:
+                    yield delta
+    if stats is not None:
+        stats.finish()
+
+
+def _parse_event(data, stats):
+    try:
+        chunk = json.loads(data)
+    except json.JSONDecodeError:
+        return ""
+    if stats is not None and isinstance(chunk.get("usage"), dict):
+        stats.completion_tokens = chunk["usage"].get("completion_tokens", stats.completion_tokens)
+    choices = chunk.get("choices") or []
+    delta = (choices[0].get("delta") or {}).get("content", "") if choices else ""
+    if delta and stats is not None:
+        stats.on_delta()
+    return delta or ""
+
+
+async def replay_text(text, stats=None):
+    """Yield a complete answer word by word so it can take the normal streaming path"""
+    for piece in re.findall(r"\S+\s*|\s+", text or ""):
+        if stats is not None:
+            stats.on_delta()
+        yield piece
+        # Give other sessions a turn on long replays
+        await asyncio.sleep(0)
+    if stats is not None:
+        stats.finish()
+
+
+NUMBERED_LINE = re.compile(r'^(\d+)\.\s*(.*)')
+
+
+class LineDeduplicator:
+    """
+    Incremental version of the old post-hoc cleanup: repeated lines are dropped and numbered
+    items renumbered 1, 2, 3... as the text streams. A partial line is released as soon as it
+    can no longer turn into a duplicate, so deduplication adds almost no time-to-first-token.
+    """
+
+    def __init__(self):
+        self.seen = set()
+        self.count = 1
+        self.entries = 0
+        self._line = ""         # raw text of the current, unfinished line
+        self._committed = None  # body of the current line already released, or None
+        self._parts = []
+
+    @property
+    def text(self):
+        """Everything released so far"""
+        return "".join(self._parts)
+
+    def feed(self, delta):
+        """Consume a raw delta and return the cleaned text that can be shown now"""
+        out = []
+        *complete, partial = (self._line + delta).split("\n")
+        # The first piece finishes the line that was in progress, the rest are whole lines
+        for line in complete:
+            self._line = line
+            out.append(self._finish_line())
+        self._line = partial
+        out.append(self._release_partial())
+        return self._emit(out)
+
+    def close(self):
+        """Flush the final line once the stream has ended"""
+        out = [self._finish_line()] if self._line or self._committed is not None else []
+        self._line = ""
+        return self._emit(out)
+
+    def _emit(self, out):
+        text = "".join(out)
+        if text:
+            self._parts.append(text)
+        return text
+
+    def _classify(self, raw):
+        """Return (numbered, body) for the line so far, or None while that's still ambiguous"""
+        head = raw.lstrip()
+        match = NUMBERED_LINE.match(head)
+        if match:
+            return True, match.group(2)
+        if head.isdigit():
+            return None  # could still become "12. ..."
+        return False, head
+
+    def _header(self, numbered):
+        prefix = "\n" if self.entries else ""
+        self.entries += 1
+        if numbered:
+            self.count += 1
+            return f"{prefix}{self.count - 1}. "
+        return prefix + "\n"
+
+    def _release_partial(self):
+        kind = self._classify(self._line)
+        if kind is None:
+            return ""
+        numbered, body = kind
+        body = body.rstrip()  # trailing whitespace may still be the end of the line
+        if not body:
+            return ""
+        if self._committed is None:
+            if any(seen.startswith(body) for seen in self.seen):
+                return ""
+            self._committed = ""
+            piece = self._header(numbered) + body
+        else:
+            piece = body[len(self._committed):]
+        self._committed = body
+        return piece
+
+    def _finish_line(self):
+        committed = self._committed
+        self._committed = None
+        stripped = self._line.strip()
+        numbered = bool(NUMBERED_LINE.match(stripped))
+        body = NUMBERED_LINE.match(stripped).group(2) if numbered else stripped
+        if committed is not None:
+            self.seen.add(body)
+            return body[len(committed):]
+        if not body or body in self.seen:
+            return ""
+        self.seen.add(body)
+        return self._header(numbered) + body
+
+
+class TokenCoalescer:
+    """Buffer streamed text and push it to sink() at most every interval / size threshold"""
+
+    def __init__(self, sink, interval=STREAM_FLUSH_INTERVAL, max_chars=STREAM_FLUSH_CHARS, stats=None):
+        self.sink = sink
+        self.interval = interval
+        self.max_chars = max_chars
+        self.stats = stats
+        self._buffer = []
+        self._size = 0
+        self._last_flush = time.perf_counter()
+        self._flushed_once = False
+
+    async def add(self, text):
+        if not text:
+            return
+        self._buffer.append(text)
+        self._size += len(text)
+        now = time.perf_counter()
+        # First token goes out immediately - that's what the user perceives as latency
+        if not self._flushed_once or self._size >= self.max_chars or now - self._last_flush >= self.interval:
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        text, self._buffer, self._size = "".join(self._buffer), [], 0
+        self._last_flush = time.perf_counter()
+        self._flushed_once = True
+        if self.stats is not None:
+            self.stats.flushes += 1
+        await self.sink(text)
+
+    async def close(self):
+        await self.flush()
@@ -0,0 +1,106 @@
+"""
+Compact per-session transcript for InfoMary
+One record per message (a role byte in an array plus the text) instead of a formatted-string list
+and a list of role/content dicts. Prompt lines and OpenAI-style messages are rendered on access.
+Messages from finished consultations are never in a prompt again, so they are kept zlib-compressed.
+"""
+
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+
+USER = 0
+ASSISTANT = 1
+ROLE_NAMES = ("user", "assistant")
+ROLE_LABELS = ("User", "Assistant")
+
+
+class Transcript:
+    """Append-only message log; the current consultation is the tail starting at consultation_start"""
+
+    __slots__ = ("_roles", "_texts", "consultation_start")
+
+    def __init__(self):
+        self._roles = array("b")
+        self._texts = []
+        self.consultation_start = 0
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, role, text):
+        self._roles.append(ROLE_NAMES.index(role))
+        self._texts.append(text)
+
+    def add_user(self, text):
+        self.add("user", text)
+
+    def add_assistant(self, text):
+        self.add("assistant", text)
+
+    def start_consultation(self):
+        """Later prompts only see messages from here on; the full log is kept for chat_messages()"""
+        for i in range(self.consultation_start, len(self._texts)):
+            self._texts[i] = zlib.compress(self._texts[i].encode("utf-8"))
+        self.consultation_start = len(self._texts)
+
+    def text(self, index):
+        text = self._texts[index]
+        return zlib.decompress(text).decode("utf-8") if isinstance(text, bytes) else text
+
+    @classmethod
+    def from_steps(cls, steps):
+        """Rebuild from a Chainlit thread's steps on resume; empty steps (audio clips) are skipped"""
+        transcript = cls()
+        for step in steps:
+            if not (step.get("output") or "").strip():
+                continue
+            if step["type"] == "user_message":
+                transcript.add_user(step["output"])
+            elif step["type"] == "assistant_message":
+                transcript.add_assistant(step["output"])
+        return transcript
+
+    def prompt_lines(self):
+        """Current consultation as "User: ..." / "Assistant: ..." lines, rendered lazily"""
+        return PromptLines(self, self.consultation_start)
+
+    def chat_messages(self):
+        """Whole session as OpenAI-style role/content dicts"""
+        return [{"role": ROLE_NAMES[role], "content": self.text(i)} for i, role in enumerate(self._roles)]
+
+    def memory_bytes(self):
+        """Approximate heap held by this transcript"""
+        return (sys.getsizeof(self) + sys.getsizeof(self._roles) + sys.getsizeof(self._texts)
+                + sum(sys.getsizeof(text) for text in self._texts))
+
+
+class PromptLines(Sequence):
+    """Read-only view of a transcript's tail as prompt lines; nothing is formatted until indexed"""
+
+    __slots__ = ("_transcript", "_start")
+
+    def __init__(self, transcript, start):
+        self._transcript = transcript
+        self._start = start
+
+    def __len__(self):
+        return len(self._transcript) - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        i = self._start + index
+        role = self._transcript._roles[i]
+        # A view can outlive start_consultation(), which compresses the entries it covers
+        text = self._transcript.text(i)
+        # Prompts have always seen user messages lower-cased
+        return f"{ROLE_LABELS[role]}: {text.lower() if role == USER else text}"
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,207 @@
+"""
+Content-addressed text-to-speech cache for InfoMary
+Audio files are named by a hash of (voice, model, text), so repeated phrases are served from disk
+without an API call. Sessions hold references to the files they are using; a background
+collector trims the directory back under its size budget, least recently used first,
+and never touches a referenced file.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+TTS_CACHE_MAX_MB = float(os.environ.get("TTS_CACHE_MAX_MB", "200"))
+TTS_CACHE_GC_INTERVAL = float(os.environ.get("TTS_CACHE_GC_INTERVAL", "300"))
+# Half-written temp files older than this are left over from a crash
+STALE_TEMP_SECONDS = 3600
+
+
+class SynthesisAbandoned(Exception):
+    """The session leading a shared synthesis was cancelled; waiters should try again themselves"""
+
+
+def tts_cache_key(voice, model, text):
+    return hashlib.sha256("\x1f".join((voice, model, text)).encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Disk LRU of synthesized audio keyed by content hash"""
+
+    def __init__(self, directory="audio_files", max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024), suffix=".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        os.makedirs(directory, exist_ok=True)
+        self._refs = {}      # session_id -> set of keys
+        self._inflight = {}  # key -> future, so concurrent requests for one phrase share a call
+        self._lock = threading.Lock()
+        self._gc_thread = None
+        self._gc_stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key):
+        """Path of the cached audio, refreshing its LRU position, or None"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, audio):
+        """Write atomically so readers never see a partial file"""
+        path = self.path_for(key)
+        tmp = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)
+        return path
+
+    async def get_or_synthesize(self, voice, model, text, synthesize, session_id=None):
+        """Return a path to the audio for text, calling synthesize(text) -> bytes only on a miss"""
+        key = tts_cache_key(voice, model, text)
+        if session_id is not None:
+            self.acquire(session_id, key)
+
+        while True:
+            path = self.get(key)
+            if path:
+                self.hits += 1
+                return path
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                path = await asyncio.shield(pending)
+            except SynthesisAbandoned:
+                continue  # the leader went away; take over if nobody else has
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio = await synthesize(text)
+            path = await asyncio.to_thread(self.put, key, audio)
+            future.set_result(path)
+            return path
+        except asyncio.CancelledError:
+            # Only this session was interrupted - never cancel the shared future, or every
+            # other session waiting on this phrase would be cancelled with it
+            future.set_exception(SynthesisAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; mark it retrieved so an unwatched future doesn't warn
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    # ------------------------------------------------------------------
+    # Per-session references
+    # ------------------------------------------------------------------
+
+    def acquire(self, session_id, key):
+        with self._lock:
+            self._refs.setdefault(session_id, set()).add(key)
+
+    def release_session(self, session_id):
+        with self._lock:
+            self._refs.pop(session_id, None)
+
+    def _referenced(self):
+        with self._lock:
+            return set().union(*self._refs.values()) if self._refs else set()
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def gc(self):
+        """Evict unreferenced files, least recently used first, until under max_bytes"""
+        referenced = self._referenced()
+        now = time.time()
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp"):
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    self._remove(entry.path)
+                continue
+            if not entry.name.endswith(self.suffix):
+                continue
+            total += stat.st_size
+            files.append((stat.st_mtime, stat.st_size, entry.path, entry.name[:-len(self.suffix)]))
+
+        evicted = 0
+        for _, size, path, key in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if key in referenced:
+                continue
+            if self._remove(path):
+                total -= size
+                evicted += 1
+        self.evictions += evicted
+        if evicted:
+            print(f"🧹 TTS cache: evicted {evicted} files, {total / 1024 / 1024:.1f} MB kept")
+        return evicted
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def start_gc(self, interval=TTS_CACHE_GC_INTERVAL):
+        """Run gc() periodically on a daemon thread"""
+        if self._gc_thread is not None:
+            return
+
+        def loop():
+            while not self._gc_stop.wait(interval):
+                try:
+                    self.gc()
+                except OSError as e:
+                    print(f"⚠️ TTS cache GC failed: {e}")
+
+        self._gc_thread = threading.Thread(target=loop, name="tts-cache-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc(self):
+        self._gc_stop.set()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "sessions": len(self._refs),
+        }
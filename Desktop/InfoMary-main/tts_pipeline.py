@@ -0,0 +1,126 @@
+"""
+Sentence-pipelined text-to-speech for InfoMary
+- SentenceSegmenter: cuts streamed text into speakable sentences as it arrives
+- SpeechPipeline:    synthesizes sentences concurrently while later tokens are still streaming,
+                     and hands the audio to the client strictly in sentence order
+"""
+
+import asyncio
+import os
+import re
+import time
+
+TTS_PIPELINE = os.environ.get("TTS_PIPELINE", "1") == "1"
+TTS_PIPELINE_CONCURRENCY = int(os.environ.get("TTS_PIPELINE_CONCURRENCY", "3"))
+# Very short segments ("1.", "Note:") sound choppy on their own - merge them with what follows
+TTS_MIN_SENTENCE_CHARS = int(os.environ.get("TTS_MIN_SENTENCE_CHARS", "30"))
+
+# A sentence ends at . ! ? followed by whitespace, or at a line break.
+# Waiting for the whitespace keeps "3.5 mg" from being split mid-number.
+SENTENCE_END = re.compile(r'[.!?](?=\s)|\n')
+
+
+class SentenceSegmenter:
+    """Incremental sentence splitter over a token stream"""
+
+    def __init__(self, min_chars=TTS_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text, return the sentences that are now complete"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def close(self):
+        """Whatever is left once the stream has ended"""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SpeechPipeline:
+    """
+    synthesize(sentence) -> audio bytes runs for up to `concurrency` sentences at once;
+    deliver(audio, sentence) is awaited one sentence at a time, in order.
+    """
+
+    def __init__(self, synthesize, deliver, concurrency=TTS_PIPELINE_CONCURRENCY, segmenter=None):
+        self.synthesize = synthesize
+        self.deliver = deliver
+        self.segmenter = segmenter or SentenceSegmenter()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._queue = asyncio.Queue()
+        self._tasks = []
+        self._delivery = asyncio.create_task(self._deliver_in_order())
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.sentences = 0
+        self.failed = 0
+
+    def feed(self, text):
+        if not text:
+            return
+        for sentence in self.segmenter.feed(text):
+            self._submit(sentence)
+
+    def _submit(self, sentence):
+        task = asyncio.create_task(self._synthesize(sentence))
+        self._tasks.append(task)
+        self._queue.put_nowait((sentence, task))
+        self.sentences += 1
+
+    async def _synthesize(self, sentence):
+        async with self._semaphore:
+            return await self.synthesize(sentence)
+
+    async def _deliver_in_order(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            sentence, task = item
+            try:
+                audio = await task
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Text-to-speech error: {e}")
+                audio = None
+            if not audio:
+                self.failed += 1
+                continue
+            if self.first_audio_at is None:
+                self.first_audio_at = time.perf_counter()
+            await self.deliver(audio, sentence)
+
+    async def close(self):
+        """Flush the last sentence and wait until every clip has been delivered"""
+        for sentence in self.segmenter.close():
+            self._submit(sentence)
+        self._queue.put_nowait(None)
+        await self._delivery
+        print(f"🔊 Speech: {self}")
+
+    async def cancel(self):
+        for task in self._tasks + [self._delivery]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, self._delivery, return_exceptions=True)
+
+    @property
+    def time_to_first_audio_ms(self):
+        if self.first_audio_at is None:
+            return None
+        return (self.first_audio_at - self.started_at) * 1000
+
+    def __str__(self):
+        ttfa = self.time_to_first_audio_ms
+        return (f"{self.sentences} sentences ({self.failed} failed) | "
+                f"time to first audio {f'{ttfa:.0f} ms' if ttfa is not None else 'n/a'}")
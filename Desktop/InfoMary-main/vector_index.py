@@ -0,0 +1,289 @@
+"""
+Pluggable retrieval backends for InfoMary
+- chroma: query the Chroma collection directly (default)
+- numpy:  keep the collection's embeddings in one contiguous float32 matrix (memory-mapped .npy)
+          and answer top-k with a vectorized dot product + argpartition. Rows are stored grouped
+          by category, so a category partition is a slice (a view) of the matrix, never a copy.
+
+Select with RETRIEVAL_BACKEND=chroma|numpy
+
+Both backends can search a single category partition; search_partitioned() then
+re-ranks the candidates with MMR so several diverse passages come back.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from embeddings import DB_PATH
+from retrieval_cache import KB_VERSION_CHECK_INTERVAL, current_kb_version
+
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "chroma").lower()
+NUMPY_INDEX_DIR = os.environ.get("NUMPY_INDEX_DIR", os.path.join(DB_PATH, "numpy_index"))
+
+# MMR re-ranking: candidates fetched per returned passage, relevance/diversity trade-off
+MMR_FETCH_MULTIPLIER = int(os.environ.get("MMR_FETCH_MULTIPLIER", "4"))
+MMR_LAMBDA = float(os.environ.get("MMR_LAMBDA", "0.6"))
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr(query_embedding, candidate_embeddings, k, lambda_mult=MMR_LAMBDA):
+    """Maximal marginal relevance: indices of k candidates balancing relevance and diversity"""
+    candidates = _normalize_rows(np.asarray(candidate_embeddings, dtype=np.float32))
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+def search_partitioned(backend, query_embedding, top_k, category=None):
+    """Search the category partition (falling back to everything), de-duplicate, MMR re-rank"""
+    fetch_k = max(top_k * MMR_FETCH_MULTIPLIER, top_k)
+    documents, embeddings = backend.query(query_embedding, fetch_k, category=category)
+    if not documents and category:
+        documents, embeddings = backend.query(query_embedding, fetch_k)
+    if not documents:
+        return []
+
+    first_seen = {}
+    for i, document in enumerate(documents):
+        first_seen.setdefault(document, i)
+    keep = sorted(first_seen.values())
+    documents = [documents[i] for i in keep]
+    embeddings = np.asarray(embeddings, dtype=np.float32)[keep]
+
+    return [documents[i] for i in mmr(query_embedding, embeddings, top_k)]
+
+
+class ChromaBackend:
+    """Top-k straight from the Chroma collection"""
+
+    name = "chroma"
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def query(self, query_embedding, n_results, category=None):
+        """Return (documents, embeddings) of the nearest chunks, optionally within one category"""
+        kwargs = {
+            "query_embeddings": [query_embedding],
+            "n_results": n_results,
+            "include": ["documents", "embeddings"],
+        }
+        if category:
+            kwargs["where"] = {"category": category}
+
+        collection = self.engine.get_collection()
+        if collection is None:
+            return [], []
+        try:
+            results = collection.query(**kwargs)
+        except Exception:
+            # Cached handle may be stale if populate_db recreated the collection
+            self.engine.reset_collection()
+            collection = self.engine.get_collection()
+            if collection is None:
+                return [], []
+            results = collection.query(**kwargs)
+        if not results["documents"] or not results["documents"][0]:
+            return [], []
+        return results["documents"][0], results["embeddings"][0]
+
+
+class NumpyVectorIndex:
+    """In-memory cosine-similarity index over a snapshot of the collection"""
+
+    def __init__(self, matrix=None, ids=None, documents=None, metadatas=None, kb_version=None):
+        self.matrix = matrix if matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        self.ids = ids or []
+        self.documents = documents or []
+        self.metadatas = metadatas or []
+        self.kb_version = kb_version
+        self._partitions = self._build_partitions()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _category(metadata):
+        return (metadata or {}).get("category")
+
+    @classmethod
+    def from_embeddings(cls, embeddings, ids, documents, metadatas=None, kb_version=None):
+        metadatas = list(metadatas or [{}] * len(ids))
+        # Group rows by category (stable) so each partition is one contiguous block
+        order = sorted(range(len(ids)), key=lambda row: str(cls._category(metadatas[row]) or ""))
+        matrix = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        matrix = np.ascontiguousarray(matrix[order]) if len(order) else np.ascontiguousarray(matrix)
+        ids, documents = list(ids), list(documents)
+        return cls(matrix, [ids[i] for i in order], [documents[i] for i in order],
+                   [metadatas[i] for i in order], kb_version)
+
+    @classmethod
+    def from_collection(cls, collection, page_size=5000):
+        """Snapshot every embedding/document in a Chroma collection"""
+        kb_version = current_kb_version()
+        ids, documents, metadatas, blocks = [], [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+            page_ids = page.get("ids") or []
+            if page_ids:
+                ids.extend(page_ids)
+                documents.extend(page["documents"])
+                metadatas.extend(m or {} for m in (page.get("metadatas") or [None] * len(page_ids)))
+                blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            if len(page_ids) < page_size:
+                break
+            offset += page_size
+        if not blocks:
+            return cls(kb_version=kb_version)
+        return cls.from_embeddings(np.vstack(blocks), ids, documents, metadatas, kb_version)
+
+    def save(self, directory=NUMPY_INDEX_DIR):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "embeddings.npy"), self.matrix)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "kb_version": self.kb_version,
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+            }, f)
+
+    @classmethod
+    def load(cls, directory=NUMPY_INDEX_DIR):
+        """Load a saved index; the matrix is memory-mapped rather than read into RAM"""
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+        return cls(matrix, meta["ids"], meta["documents"], meta["metadatas"], meta.get("kb_version"))
+
+    def _build_partitions(self):
+        """
+        category -> (rows, matrix). rows is a slice and matrix a view of self.matrix when the
+        category's rows are contiguous (any index built by from_embeddings). An index saved by an
+        older version may interleave categories; those partitions are gathered once, here.
+        """
+        rows_by_category = {}
+        for row, metadata in enumerate(self.metadatas):
+            rows_by_category.setdefault(self._category(metadata), []).append(row)
+        partitions = {}
+        for category, rows in rows_by_category.items():
+            start, stop = rows[0], rows[-1] + 1
+            if stop - start == len(rows):
+                partitions[category] = (slice(start, stop), self.matrix[start:stop])
+            else:
+                rows = np.asarray(rows, dtype=np.int64)
+                partitions[category] = (rows, np.ascontiguousarray(self.matrix[rows]))
+        return partitions
+
+    def partition(self, category):
+        """(rows, matrix) of the chunks tagged with category; rows is a slice or an index array"""
+        return self._partitions.get(category, (slice(0, 0), self.matrix[:0]))
+
+    def search(self, query_embedding, k, category=None):
+        """Return (row indices, scores) of the k most similar rows, best first"""
+        if category is None:
+            rows, matrix = None, self.matrix
+        else:
+            rows, matrix = self.partition(category)
+        n = len(matrix)
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query
+        k = min(k, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top])]
+        if rows is None:
+            return top, scores[top]
+        return (top + rows.start if isinstance(rows, slice) else rows[top]), scores[top]
+
+    def query(self, query_embedding, n_results, category=None):
+        top, _ = self.search(query_embedding, n_results, category or None)
+        return [self.documents[i] for i in top], self.matrix[top]
+
+
+class NumpyBackend:
+    """NumpyVectorIndex that rebuilds itself from Chroma when the knowledge base changes"""
+
+    name = "numpy"
+
+    def __init__(self, engine, directory=NUMPY_INDEX_DIR):
+        self.engine = engine
+        self.directory = directory
+        self.index = None
+        self._lock = threading.Lock()
+        self._next_version_check = 0.0
+
+    def _load_or_build(self):
+        version = current_kb_version()
+        try:
+            index = NumpyVectorIndex.load(self.directory)
+            if index.kb_version == version:
+                return index
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        collection = self.engine.get_collection()
+        if collection is None:
+            return NumpyVectorIndex(kb_version=version)
+        print("🔄 Building NumPy vector index from Chroma...")
+        index = NumpyVectorIndex.from_collection(collection)
+        index.save(self.directory)
+        print(f"✅ NumPy vector index ready: {len(index)} chunks")
+        # Re-open memory-mapped so every process shares the page cache
+        return NumpyVectorIndex.load(self.directory) if len(index) else index
+
+    def _current_index(self):
+        now = time.monotonic()
+        if self.index is not None and now < self._next_version_check:
+            return self.index
+        with self._lock:
+            self._next_version_check = now + KB_VERSION_CHECK_INTERVAL
+            if self.index is None or self.index.kb_version != current_kb_version():
+                self.engine.reset_collection()
+                self.index = self._load_or_build()
+            return self.index
+
+    def query(self, query_embedding, n_results, category=None):
+        return self._current_index().query(query_embedding, n_results, category)
+
+
+BACKENDS = {
+    "chroma": ChromaBackend,
+    "numpy": NumpyBackend,
+}
+
+
+def get_backend(engine, name=RETRIEVAL_BACKEND):
+    if name not in BACKENDS:
+        print(f"⚠️ Unknown RETRIEVAL_BACKEND '{name}', falling back to chroma")
+        name = "chroma"
+    print(f"🔎 Retrieval backend: {name}")
+    return BACKENDS[name](engine)
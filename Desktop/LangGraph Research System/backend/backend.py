@@ -5,9 +5,17 @@ Fixed: Actual research execution, proper completion detection, status management
 
 import os
 import json
+import math
+import time
+import random
+import sqlite3
 import asyncio
-from typing import TypedDict, Annotated, List, Literal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, Annotated, List, Literal, Optional
 from datetime import datetime
+from collections import deque
+from contextlib import asynccontextmanager
 import operator
 import re
 
@@ -28,7 +36,14 @@ load_dotenv()
 # CONFIGURATION
 # ============================================================================
 
-app = FastAPI(title="Voice Research System - Production")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """One pooled Fireworks session for the whole app lifetime"""
+    await fireworks_client.start()
+    yield
+    await fireworks_client.close()
+
+app = FastAPI(title="Voice Research System - Production", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +56,38 @@ app.add_middleware(
 FIREWORKS_API_KEY = os.getenv("FIREWORKS_API_KEY")
 VAPI_API_KEY = os.getenv("VAPI_API_KEY")
 
+# Fireworks client: keep-alive pool, deadlines, jittered retries and a global concurrency cap
+FIREWORKS_URL = "https://api.fireworks.ai/inference/v1/chat/completions"
+FIREWORKS_MODEL = os.getenv("FIREWORKS_MODEL", "accounts/fireworks/models/kimi-k2-instruct-0905")
+FIREWORKS_MAX_CONCURRENCY = int(os.getenv("FIREWORKS_MAX_CONCURRENCY", "8"))
+FIREWORKS_POOL_SIZE = int(os.getenv("FIREWORKS_POOL_SIZE", "20"))
+FIREWORKS_CONNECT_TIMEOUT = float(os.getenv("FIREWORKS_CONNECT_TIMEOUT", "10"))
+FIREWORKS_READ_TIMEOUT = float(os.getenv("FIREWORKS_READ_TIMEOUT", "120"))
+FIREWORKS_MAX_RETRIES = int(os.getenv("FIREWORKS_MAX_RETRIES", "3"))
+FIREWORKS_BACKOFF_BASE = 0.5
+FIREWORKS_BACKOFF_CAP = 8.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Stream the synthesis report to the dashboard as it is generated
+SYNTHESIS_STREAMING = os.getenv("SYNTHESIS_STREAMING", "1") == "1"
+SYNTHESIS_DELTA_INTERVAL = float(os.getenv("SYNTHESIS_DELTA_INTERVAL", "0.1"))  # seconds between delta broadcasts
+
+# Research workers: searches run concurrently on a thread pool, capped across all research jobs
+MAX_WORKERS_PER_RUN = 5
+WORKER_MAX_PARALLEL = int(os.getenv("WORKER_MAX_PARALLEL", "5"))
+WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", "20"))
+# Straggler policy: once this fraction of workers has reported, the rest get a short grace period
+WORKER_QUORUM = float(os.getenv("WORKER_QUORUM", "0.6"))
+WORKER_STRAGGLER_GRACE = float(os.getenv("WORKER_STRAGGLER_GRACE", "5"))
+
+# Search results cache (SQLite, survives restarts) and near-duplicate query collapsing
+SEARCH_CACHE_DB = os.getenv("SEARCH_CACHE_DB", "search_cache.db")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+
+# Identical research requests share one run; a finished report is reused for this long
+RESEARCH_DEDUP = os.getenv("RESEARCH_DEDUP", "1") == "1"
+RESEARCH_RESULT_TTL = float(os.getenv("RESEARCH_RESULT_TTL", str(10 * 60)))
+
 # ============================================================================
 # GLOBAL STATE MANAGEMENT
 # ============================================================================
@@ -109,36 +156,236 @@ manager = ConnectionManager()
 # AI & SEARCH SETUP
 # ============================================================================
 
+class FireworksError(Exception):
+    pass
+
+class FireworksClient:
+    """Long-lived aiohttp session for Fireworks with per-call latency and token usage metrics"""
+    def __init__(self):
+        self._session = None
+        self._semaphore = asyncio.Semaphore(FIREWORKS_MAX_CONCURRENCY)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Measured per HTTP attempt, so retry backoff doesn't inflate the percentiles
+        self.latencies = deque(maxlen=500)
+        self.ttfts = deque(maxlen=500)
+    
+    async def start(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=FIREWORKS_POOL_SIZE, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=None, connect=FIREWORKS_CONNECT_TIMEOUT,
+                                              sock_read=FIREWORKS_READ_TIMEOUT),
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {FIREWORKS_API_KEY}"
+                }
+            )
+            print(f"✅ Fireworks session ready (pool {FIREWORKS_POOL_SIZE}, max {FIREWORKS_MAX_CONCURRENCY} concurrent)")
+        return self._session
+    
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _payload(self, messages: List[dict], max_tokens: int, temperature: float, stream: bool = False) -> dict:
+        return {
+            "model": FIREWORKS_MODEL,
+            "max_tokens": max_tokens,
+            "top_p": 1,
+            "top_k": 40,
+            "presence_penalty": 0,
+            "frequency_penalty": 0,
+            "temperature": temperature,
+            "messages": messages,
+            "stream": stream,
+        }
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: str = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), FIREWORKS_BACKOFF_CAP)
+            except ValueError:
+                pass
+        # Full jitter keeps parallel research jobs from retrying in lockstep
+        return random.uniform(0, min(FIREWORKS_BACKOFF_CAP, FIREWORKS_BACKOFF_BASE * 2 ** attempt))
+    
+    def _record(self, started: float, usage: dict = None, failed: bool = False):
+        self.calls += 1
+        self.errors += int(failed)
+        self.latencies.append(time.perf_counter() - started)
+        if usage:
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
+    
+    async def chat(self, messages: List[dict], max_tokens: int = 4000, temperature: float = 0.3) -> str:
+        session = await self.start()
+        payload = self._payload(messages, max_tokens, temperature)
+        
+        for attempt in range(FIREWORKS_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.post(FIREWORKS_URL, json=payload) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < FIREWORKS_MAX_RETRIES:
+                            delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                            print(f"⚠️ Fireworks returned {response.status}, retrying in {delay:.1f}s ({attempt + 1}/{FIREWORKS_MAX_RETRIES})")
+                        else:
+                            body = await response.text()
+                            try:
+                                data = json.loads(body)
+                            except ValueError as e:
+                                # Gateways answer 502/504 with HTML, not JSON
+                                raise FireworksError(f"Fireworks API error {response.status}: {body[:200]!r}") from e
+                            if not isinstance(data, dict):
+                                raise FireworksError(f"Unexpected API response: {data}")
+                            if "error" in data:
+                                raise FireworksError(f"Fireworks API error: {data['error']}")
+                            if "choices" not in data:
+                                raise FireworksError(f"Unexpected API response: {data}")
+                            self._record(started, data.get("usage"))
+                            return data["choices"][0]["message"]["content"]
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= FIREWORKS_MAX_RETRIES:
+                    self._record(started, failed=True)
+                    raise FireworksError(f"Fireworks request failed: {e!r}") from e
+                delay = self._retry_delay(attempt)
+                print(f"⚠️ Fireworks transport error {e!r}, retrying in {delay:.1f}s ({attempt + 1}/{FIREWORKS_MAX_RETRIES})")
+            except FireworksError:
+                self._record(started, failed=True)
+                raise
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    async def stream(self, messages: List[dict], max_tokens: int = 4000, temperature: float = 0.3):
+        """Yield content deltas from an SSE completion. Retries only happen before the first byte."""
+        session = await self.start()
+        payload = self._payload(messages, max_tokens, temperature, stream=True)
+        first_token = None
+        usage = None
+        
+        for attempt in range(FIREWORKS_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.post(FIREWORKS_URL, json=payload) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < FIREWORKS_MAX_RETRIES:
+                            delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                            print(f"⚠️ Fireworks returned {response.status}, retrying in {delay:.1f}s ({attempt + 1}/{FIREWORKS_MAX_RETRIES})")
+                        elif response.status != 200:
+                            raise FireworksError(f"Fireworks API error {response.status}: {await response.text()}")
+                        else:
+                            async for raw in response.content:
+                                line = raw.decode("utf-8").strip()
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                try:
+                                    chunk = json.loads(data)
+                                except ValueError as e:
+                                    raise FireworksError(f"Malformed stream chunk: {data[:200]!r}") from e
+                                if "error" in chunk:
+                                    raise FireworksError(f"Fireworks API error: {chunk['error']}")
+                                usage = chunk.get("usage") or usage
+                                for choice in chunk.get("choices", []):
+                                    delta = choice.get("delta", {}).get("content")
+                                    if delta:
+                                        if first_token is None:
+                                            first_token = time.perf_counter()
+                                            self.ttfts.append(first_token - started)
+                                        yield delta
+                            self._record(started, usage)
+                            return
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if first_token is not None or attempt >= FIREWORKS_MAX_RETRIES:
+                    self._record(started, failed=True)
+                    raise FireworksError(f"Fireworks stream failed: {e!r}") from e
+                delay = self._retry_delay(attempt)
+                print(f"⚠️ Fireworks transport error {e!r}, retrying in {delay:.1f}s ({attempt + 1}/{FIREWORKS_MAX_RETRIES})")
+            except FireworksError:
+                self._record(started, failed=True)
+                raise
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    def stats(self) -> dict:
+        def pct(values, q):
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(q * len(values)))] * 1000) if values else None
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "latency_p50_ms": pct(self.latencies, 0.5),
+            "latency_p95_ms": pct(self.latencies, 0.95),
+            "ttft_p50_ms": pct(self.ttfts, 0.5),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "max_concurrency": FIREWORKS_MAX_CONCURRENCY
+        }
+
+fireworks_client = FireworksClient()
+
 async def call_fireworks(messages: List[dict]) -> str:
     """Call Fireworks AI Kimi model"""
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "https://api.fireworks.ai/inference/v1/chat/completions",
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {FIREWORKS_API_KEY}"
-            },
-            json={
-                "model": "accounts/fireworks/models/kimi-k2-instruct-0905",
-                "max_tokens": 4000,
-                "top_p": 1,
-                "top_k": 40,
-                "presence_penalty": 0,
-                "frequency_penalty": 0,
-                "temperature": 0.3,
-                "messages": messages,
-            }
-        ) as response:
-            data = await response.json()
-            
-            if "error" in data:
-                raise Exception(f"Fireworks API error: {data['error']}")
-            
-            if "choices" not in data:
-                raise Exception(f"Unexpected API response: {data}")
-            
-            return data["choices"][0]["message"]["content"]
+    return await fireworks_client.chat(messages)
+
+async def call_fireworks_streaming(messages: List[dict], call_id: Optional[str] = None) -> str:
+    """Stream a completion to the dashboard as synthesis_delta events and return the full text"""
+    parts = []
+    pending = []
+    seq = 0
+    started = time.perf_counter()
+    ttft_ms = None
+    last_flush = started
+    
+    async def flush(done: bool = False, error: Optional[str] = None):
+        nonlocal seq, last_flush
+        event = {"type": "synthesis_delta", "call_id": call_id, "seq": seq, "delta": "".join(pending), "done": done}
+        if done:
+            event["ttft_ms"] = ttft_ms
+        if error:
+            event["error"] = error
+        await manager.broadcast(event)
+        pending.clear()
+        seq += 1
+        last_flush = time.perf_counter()
+    
+    # Whatever happens, the dashboard gets a final done event so its live panel can close
+    error = "Synthesis was interrupted"
+    try:
+        try:
+            async for delta in fireworks_client.stream(messages):
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000)
+                    print(f"⚡ Synthesis first token after {ttft_ms} ms")
+                parts.append(delta)
+                pending.append(delta)
+                # Coalesce tokens so the socket sees a few events per second, not one per token
+                if time.perf_counter() - last_flush >= SYNTHESIS_DELTA_INTERVAL:
+                    await flush()
+        except FireworksError as e:
+            if parts:
+                raise
+            print(f"⚠️ Streaming synthesis failed before first token, falling back: {e}")
+            text = await call_fireworks(messages)
+            parts.append(text)
+            pending.append(text)
+        error = None
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        await flush(done=True, error=error)
+    return "".join(parts)
 
 # ============================================================================
 # DUCKDUCKGO SEARCH INTEGRATION
@@ -224,6 +471,215 @@ def web_search_tool(query: str) -> dict:
             "error": str(e)
         }
 
+# ============================================================================
+# SEARCH CACHE
+# ============================================================================
+
+QUERY_STOPWORDS = {"a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "about", "with", "what", "is", "are"}
+
+def query_tokens(query: str) -> set:
+    return {t for t in re.findall(r"[a-z0-9]+", query.lower()) if t not in QUERY_STOPWORDS}
+
+# Words that narrow a query in time but not in subject - "X trends" vs "X latest trends 2024"
+TRIVIAL_QUERY_TOKENS = {"latest", "recent", "current", "new", "today", "now", "update", "updates"}
+
+def is_trivial_token(token: str) -> bool:
+    return token in TRIVIAL_QUERY_TOKENS or token.isdigit()
+
+def is_near_duplicate(tokens: set, other: set) -> bool:
+    """Only trivial words differ, and the two don't pin different years ("X 2023" vs "X 2024")"""
+    added, dropped = tokens - other, other - tokens
+    if not all(is_trivial_token(t) for t in added | dropped):
+        return False
+    return not (any(t.isdigit() for t in added) and any(t.isdigit() for t in dropped))
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation, stopwords and word order don't change what we'd search for"""
+    return " ".join(sorted(query_tokens(query)))
+
+def collapse_queries(queries: List[str]) -> List[str]:
+    """
+    Drop planned queries that are near-duplicates of an earlier one - e.g. "X trends" vs
+    "X trends 2024". Two queries collapse only when the words they don't share are all trivial
+    (a year, "latest", ...). Facets of one topic ("X overview", "X applications") differ in a
+    real word and are both kept, however long X is; so are "X 2023" and "X 2024".
+    """
+    kept, kept_tokens = [], []
+    for query in queries:
+        tokens = query_tokens(query)
+        if not tokens:
+            continue
+        if any(is_near_duplicate(tokens, other) for other in kept_tokens):
+            continue
+        kept.append(query)
+        kept_tokens.append(tokens)
+    return kept
+
+class SearchCache:
+    """Search results keyed by normalized query, with a TTL; safe to use from the search threads"""
+    def __init__(self, path: str = SEARCH_CACHE_DB, ttl: float = SEARCH_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self._db = None
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._db.execute("DELETE FROM search_results WHERE created_at < ?", (time.time() - ttl,))
+            self._db.commit()
+            print(f"✅ Search cache ready at {path}")
+        except sqlite3.Error as e:
+            print(f"⚠️ Search cache disabled: {e}")
+            self._db = None
+    
+    def get(self, query: str):
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM search_results WHERE key = ? AND created_at >= ?",
+                (normalize_query(query), time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, query: str, result: dict):
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_results (key, query, result, created_at) VALUES (?, ?, ?, ?)",
+                    (normalize_query(query), query, json.dumps(result), time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Search cache write failed: {e}")
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "collapsed_queries": self.collapsed,
+            "ttl_seconds": self.ttl
+        }
+
+search_cache = SearchCache()
+
+def cached_web_search(query: str) -> dict:
+    """web_search_tool behind the search cache; runs on a search thread"""
+    cached = search_cache.get(query)
+    if cached is not None:
+        print(f"💾 Search cache hit: '{query}'")
+        return {**cached, "query": query, "cached": True}
+    result = web_search_tool.invoke({"query": query})
+    # Mock and failed searches aren't worth keeping
+    if SEARCH_AVAILABLE and not result.get("error"):
+        search_cache.put(query, result)
+    return result
+
+# ============================================================================
+# CONCURRENT SEARCH EXECUTION
+# ============================================================================
+
+# DDGS is blocking - it runs here, never on the event loop. Threads of timed-out searches can't be
+# killed, so the pool has headroom beyond the parallelism cap.
+search_executor = ThreadPoolExecutor(max_workers=WORKER_MAX_PARALLEL * 2, thread_name_prefix="search")
+search_semaphore = asyncio.Semaphore(WORKER_MAX_PARALLEL)
+
+def failed_search_result(query: str, reason: str) -> dict:
+    return {
+        "query": query,
+        "summary": f"Search for '{query}' did not complete: {reason}",
+        "key_facts": ["Unable to complete search - please try again"],
+        "sources": ["Search Unavailable"],
+        "reliability_score": 50,
+        "error": reason
+    }
+
+async def run_search(query: str, timeout: float = WORKER_TIMEOUT) -> dict:
+    """web_search_tool on the search pool, within the global parallelism cap and a per-search deadline"""
+    loop = asyncio.get_running_loop()
+    async with search_semaphore:
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(search_executor, cached_web_search, query),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"⏱️ Search timed out after {timeout:.0f}s: '{query}'")
+            return failed_search_result(query, f"timed out after {timeout:.0f}s")
+        except Exception as e:
+            print(f"❌ Search failed for '{query}': {e}")
+            return failed_search_result(query, str(e))
+
+async def run_worker(worker_id: int, query: str, call_id: str = None) -> dict:
+    """One research worker: search, then publish its result immediately"""
+    await manager.broadcast({
+        "type": "node_update",
+        "node": {
+            "id": f"worker_{worker_id}",
+            "label": f"🤖 Worker {worker_id}",
+            "status": "researching",
+            "query": query
+        }
+    })
+    
+    await manager.broadcast({
+        "type": "log",
+        "message": f"🤖 Worker {worker_id}: Researching '{query}'...",
+        "log_type": "worker"
+    })
+    
+    started = time.perf_counter()
+    result = await run_search(query)
+    worker_result = {
+        "worker_id": worker_id,
+        "search_term": query,
+        **result,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000)
+    }
+    
+    await manager.broadcast({
+        "type": "worker_result",
+        "call_id": call_id,
+        "data": worker_result
+    })
+    
+    await manager.broadcast({
+        "type": "log",
+        "message": (f"⚠️ Worker {worker_id}: {result['error']}" if result.get("error")
+                    else f"✅ Worker {worker_id}: Found {len(result.get('key_facts', []))} facts"),
+        "log_type": "error" if result.get("error") else "success"
+    })
+    
+    await manager.broadcast({
+        "type": "node_update",
+        "node": {
+            "id": f"worker_{worker_id}",
+            "label": f"🤖 Worker {worker_id}",
+            "status": "failed" if result.get("error") else "completed",
+            "query": query
+        }
+    })
+    
+    return worker_result
+
 # ============================================================================
 # LANGGRAPH STATE & NODES
 # ============================================================================
@@ -335,7 +791,18 @@ async def workers_node(state: ResearchState) -> dict:
     """Worker agents - Execute research tasks"""
     
     research_plan = state["research_plan"]
-    search_queries = research_plan["search_queries"][:5]
+    planned_queries = research_plan["search_queries"]
+    distinct_queries = collapse_queries(planned_queries)
+    search_cache.collapsed += len(planned_queries) - len(distinct_queries)
+    search_queries = distinct_queries[:MAX_WORKERS_PER_RUN]
+    call_id = state.get("call_id")
+    
+    if len(distinct_queries) < len(planned_queries):
+        await manager.broadcast({
+            "type": "log",
+            "message": f"🧹 Collapsed {len(planned_queries) - len(distinct_queries)} near-duplicate search queries",
+            "log_type": "info"
+        })
     
     await manager.broadcast({
         "type": "log",
@@ -343,52 +810,52 @@ async def workers_node(state: ResearchState) -> dict:
         "log_type": "info"
     })
     
-    worker_results = []
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    tasks = {
+        asyncio.create_task(run_worker(i + 1, query, call_id)): (i, query)
+        for i, query in enumerate(search_queries)
+    }
+    results = {}
+    pending = set(tasks)
+    quorum = max(1, math.ceil(len(tasks) * WORKER_QUORUM))
+    deadline = None
     
-    for i, query in enumerate(search_queries):
-        await manager.broadcast({
-            "type": "node_update",
-            "node": {
-                "id": f"worker_{i+1}",
-                "label": f"🤖 Worker {i+1}",
-                "status": "researching",
-                "query": query
-            }
-        })
-        
-        await manager.broadcast({
-            "type": "log",
-            "message": f"🤖 Worker {i+1}: Researching '{query}'...",
-            "log_type": "worker"
-        })
-        
-        result = web_search_tool.invoke({"query": query})
-        
-        worker_results.append({
-            "worker_id": i + 1,
-            "search_term": query,
-            **result
-        })
-        
+    while pending:
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break  # grace period for stragglers is over
+        for task in done:
+            results[tasks[task][0]] = task.result()
+        if deadline is None and pending and len(results) >= quorum:
+            deadline = loop.time() + WORKER_STRAGGLER_GRACE
+    
+    for task in pending:
+        task.cancel()
+        i, query = tasks[task]
+        results[i] = {"worker_id": i + 1, "search_term": query,
+                      **failed_search_result(query, "dropped as a straggler")}
         await manager.broadcast({
             "type": "log",
-            "message": f"✅ Worker {i+1}: Found {len(result.get('key_facts', []))} facts",
-            "log_type": "success"
+            "message": f"⏱️ Worker {i + 1}: Dropped as a straggler after {WORKER_STRAGGLER_GRACE:.0f}s grace",
+            "log_type": "error"
         })
-        
         await manager.broadcast({
             "type": "node_update",
             "node": {
-                "id": f"worker_{i+1}",
-                "label": f"🤖 Worker {i+1}",
-                "status": "completed",
+                "id": f"worker_{i + 1}",
+                "label": f"🤖 Worker {i + 1}",
+                "status": "skipped",
                 "query": query
             }
         })
-        
-        await asyncio.sleep(0.3)
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
     
-    print(f"✅ All {len(worker_results)} workers completed")
+    worker_results = [results[i] for i in sorted(results)]
+    
+    print(f"✅ All {len(worker_results)} workers completed in {time.perf_counter() - started:.1f}s")
     
     return {
         "messages": state.get("messages", []),
@@ -515,10 +982,14 @@ Structure your response with these sections:
 
 Be comprehensive, insightful, and synthesize information from all sources. Use clear, professional language."""
 
-    response = await call_fireworks([
+    synthesis_messages = [
         {"role": "system", "content": "You are an expert research analyst who creates comprehensive, well-structured reports. Be thorough and insightful."},
         {"role": "user", "content": synthesis_prompt}
-    ])
+    ]
+    if SYNTHESIS_STREAMING:
+        response = await call_fireworks_streaming(synthesis_messages, state.get("call_id"))
+    else:
+        response = await call_fireworks(synthesis_messages)
     
     synthesis = response
     
@@ -598,9 +1069,10 @@ print("✅ Research graph compiled successfully")
 # RESEARCH EXECUTION - FIXED TO ACTUALLY RUN
 # ============================================================================
 
-async def run_research(query: str, call_id: str = None):
+async def run_research(query: str, call_id: str = None) -> Optional[dict]:
     """
     Execute ACTUAL research workflow
+    Returns the results dict, or None if the research failed
     """
     try:
         print(f"\n{'='*80}")
@@ -696,6 +1168,7 @@ async def run_research(query: str, call_id: str = None):
                 })
 
             print(f"🎉 RESEARCH COMPLETED SUCCESSFULLY | Query: {query} | Call ID: {call_id}\n")
+            return results
 
     except Exception as e:
         print(f"\n❌ RESEARCH ERROR | Query: {query} | Call ID: {call_id} | Error: {e}\n")
@@ -712,9 +1185,148 @@ async def run_research(query: str, call_id: str = None):
         
         await manager.broadcast({
             "type": "error",
-            "message": f"Research failed: {str(e)}"
+            "message": f"Research failed: {str(e)}",
+            "call_id": call_id
         })
 
+# ============================================================================
+# RESEARCH DE-DUPLICATION
+# ============================================================================
+
+def research_key(query: str) -> str:
+    """
+    Case, punctuation and stopwords don't change the question, but word order does -
+    "dogs bite people" is not "people bite dogs". (The search cache can use the looser
+    normalize_query(), a research answer can't.)
+    """
+    tokens = [t for t in re.findall(r"[a-z0-9]+", query.lower()) if t not in QUERY_STOPWORDS]
+    return " ".join(tokens) or query.strip().lower()
+
+class ResearchFlights:
+    """
+    Single-flight layer over run_research, keyed on research_key(). A request for a topic
+    that is already being researched attaches to that run; one that finished within
+    RESEARCH_RESULT_TTL is answered from the stored report. Every attached call_id gets its
+    own research_status entry when the run ends.
+    """
+    def __init__(self, ttl: float = RESEARCH_RESULT_TTL):
+        self.ttl = ttl
+        self._inflight = {}  # key -> {"task", "leader", "call_ids"}
+        self._recent = {}    # key -> (finished_at, results)
+        self.started = 0
+        self.attached = 0
+        self.reused = 0
+    
+    def _fresh(self, key: str) -> Optional[dict]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        finished_at, results = entry
+        if time.monotonic() - finished_at > self.ttl:
+            del self._recent[key]
+            return None
+        return results
+    
+    async def submit(self, query: str, call_id: str) -> str:
+        """Start, join or answer a research request. Returns "started", "attached" or "reused"."""
+        key = research_key(query)
+        
+        flight = self._inflight.get(key)
+        if flight is not None:
+            if call_id in flight["call_ids"]:
+                # Redelivered webhook for a call that is already being served
+                return "attached"
+            flight["call_ids"].add(call_id)
+            self.attached += 1
+            print(f"🔗 Attaching {call_id} to in-flight research for '{query}' (led by {flight['leader']})")
+            await research_status.set_status(call_id, {
+                "complete": False,
+                "in_progress": True,
+                "query": query,
+                "started_at": datetime.now().isoformat(),
+                "attached_to": flight["leader"],
+                "announced": False,
+                "results": None
+            })
+            return "attached"
+        
+        await research_status.clear_status(call_id)
+        
+        results = self._fresh(key)
+        if results is not None:
+            self.reused += 1
+            results = {**results, "call_id": call_id, "reused": True}
+            print(f"♻️ Reusing research on '{query}' for {call_id}")
+            await manager.broadcast({"type": "clear_results"})
+            await manager.broadcast({"type": "result", "data": results})
+            await research_status.set_status(call_id, {
+                "complete": True,
+                "in_progress": False,
+                "completed_at": datetime.now().isoformat(),
+                "results": results,
+                "query": query,
+                "source_count": len(results["sources"]),
+                "confidence": results["confidence"],
+                "announced": False
+            })
+            return "reused"
+        
+        self.started += 1
+        self._inflight[key] = {
+            "task": asyncio.create_task(self._run(key, query, call_id)),
+            "leader": call_id,
+            "call_ids": {call_id}
+        }
+        return "started"
+    
+    async def _run(self, key: str, query: str, call_id: str):
+        try:
+            results = await run_research(query, call_id)
+        except asyncio.CancelledError:
+            # run_research only handles Exception; don't leave anyone polling a dead run
+            flight = self._inflight.pop(key, None)
+            for attached in (flight["call_ids"] if flight else {call_id}):
+                await research_status.set_status(attached, {
+                    "complete": False,
+                    "in_progress": False,
+                    "error": "Research was cancelled",
+                    "failed_at": datetime.now().isoformat()
+                })
+            raise
+        
+        # Close the flight before the first await, so a webhook arriving while followers are
+        # being notified starts (or reuses) a run instead of joining one that has already ended
+        flight = self._inflight.pop(key)
+        now = time.monotonic()
+        for stale in [k for k, (finished_at, _) in self._recent.items() if now - finished_at > self.ttl]:
+            del self._recent[stale]
+        if results is not None:
+            self._recent[key] = (now, results)
+        
+        followers = flight["call_ids"] - {call_id}
+        if not followers:
+            return
+        # Followers get the leader's final status, with their own call_id on the results
+        leader_status = await research_status.get_status(call_id)
+        for follower in followers:
+            status = {k: v for k, v in leader_status.items() if k != "updated_at"}
+            if status.get("results"):
+                status["results"] = {**status["results"], "call_id": follower}
+            status["announced"] = False
+            await research_status.set_status(follower, status)
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": RESEARCH_DEDUP,
+            "in_flight": len(self._inflight),
+            "started": self.started,
+            "attached": self.attached,
+            "reused": self.reused,
+            "ttl_seconds": self.ttl
+        }
+
+research_flights = ResearchFlights()
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -741,6 +1353,9 @@ async def health_check():
         "model": "Fireworks AI - Kimi K2",
         "search": "DuckDuckGo (Real-time)" if SEARCH_AVAILABLE else "Mock Search",
         "features": ["voice", "vapi", "real_time", "multi_agent", "pdf", "docx", "md"],
+        "search_cache": search_cache.stats(),
+        "llm": fireworks_client.stats(),
+        "research_dedup": research_flights.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -808,16 +1423,27 @@ async def research_webhook(request: Request):
         if not call_id or call_id == "unknown_call_id":
             print("⚠️ WARNING: No call_id found! Voice notification may not work.\n")
 
-        # Clear old research for this call
-        await research_status.clear_status(call_id)
-
         # Start research asynchronously
         print(f"🚀 Starting research task...\n   Query: '{query}'\n   Call ID: {call_id}\n")
-        asyncio.create_task(run_research(query, call_id))
+        if RESEARCH_DEDUP:
+            mode = await research_flights.submit(query, call_id)
+        else:
+            # Clear old research for this call
+            await research_status.clear_status(call_id)
+            asyncio.create_task(run_research(query, call_id))
+            mode = "started"
 
         # Return in Vapi-expected format
         tool_call_id = tool_calls[0].get("id") if tool_calls else "unknown"
         
+        if mode == "reused":
+            return {
+                "results": [{
+                    "toolCallId": tool_call_id,
+                    "result": f"Good news! I researched {query} just a few minutes ago, so the report is already ready on your dashboard."
+                }]
+            }
+        
         return {
             "results": [{
                 "toolCallId": tool_call_id,
@@ -0,0 +1,48 @@
+"""
+Sanity check for planned-query collapsing: near-duplicates go, distinct facets of a topic stay
+however many words the topic has, and queries pinned to different years both stay.
+
+Usage:
+    python check_search_dedup.py
+"""
+
+from backend import collapse_queries
+
+FACETS = ["overview", "applications", "challenges", "latest trends", "future outlook"]
+TOPICS = [
+    "quantum computing",
+    "electric vehicle battery recycling",
+    "impact of artificial intelligence on healthcare",
+    "economic effects of remote work on small city downtown businesses",
+    # 18+ content words: one differing facet word is a tiny share of the token set
+    "long term economic social and environmental effects of large scale offshore wind farm "
+    "construction projects on coastal fishing communities tourism biodiversity and local "
+    "electricity prices in northern europe",
+]
+YEAR_PAIRS = [
+    ("quantum computing 2023 results", "quantum computing 2024 results"),
+    ("2023 electric vehicle sales", "2024 electric vehicle sales"),
+]
+
+
+def main():
+    for topic in TOPICS:
+        planned = [f"{topic} {facet}" for facet in FACETS]
+        kept = collapse_queries(planned)
+        assert kept == planned, f"facets of '{topic}' collapsed: {planned} -> {kept}"
+
+        duplicates = [f"{topic} trends", f"{topic} latest trends 2024", f"trends {topic}", f"{topic} applications"]
+        kept = collapse_queries(duplicates)
+        assert kept == [f"{topic} trends", f"{topic} applications"], f"duplicates of '{topic}' kept: {kept}"
+        print(f"✅ {topic}: {len(FACETS)} facets kept, 2 near-duplicates collapsed")
+
+    for first, second in YEAR_PAIRS:
+        kept = collapse_queries([first, second])
+        assert kept == [first, second], f"different years collapsed: {kept}"
+        kept = collapse_queries([first, f"latest {first}"])
+        assert kept == [first], f"same-year duplicate kept: {kept}"
+        print(f"✅ '{first}' and '{second}' both kept")
+
+
+if __name__ == "__main__":
+    main()
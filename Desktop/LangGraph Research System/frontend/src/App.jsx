@@ -11,6 +11,8 @@ const App = () => {
   const [isResearching, setIsResearching] = useState(false);
   const [nodes, setNodes] = useState([]);
   const [results, setResults] = useState(null);
+  // Streaming reports keyed by call_id, so concurrent research runs don't share a buffer
+  const [liveSynthesis, setLiveSynthesis] = useState({});
   const [logs, setLogs] = useState([]);
   const [backendStatus, setBackendStatus] = useState('checking');
   const [wsConnected, setWsConnected] = useState(false);
@@ -206,9 +208,19 @@ const App = () => {
       case 'node_update':
         updateNode(data.node);
         break;
+      case 'worker_result':
+        // Each worker publishes as soon as its search returns; show it on the worker's card
+        updateNode({
+          id: `worker_${data.data.worker_id}`,
+          facts: data.data.key_facts?.length || 0,
+          elapsedMs: data.data.elapsed_ms,
+          error: data.data.error
+        });
+        break;
       case 'result':
         // **FIX: Properly handle results**
         setResults(data.data);
+        dropLiveSynthesis(data.data?.call_id);
         setIsResearching(false);
         addLog('🎉 Research complete! Results ready below.', 'success');
         break;
@@ -218,17 +230,45 @@ const App = () => {
         setNodes([]);
         addLog('🗑️ Cleared previous results', 'info');
         break;
+      case 'synthesis_delta':
+        // Report tokens as they are generated, appended to this call's own buffer
+        if (data.error) {
+          dropLiveSynthesis(data.call_id);
+          addLog(`❌ Report streaming stopped: ${data.error}`, 'error');
+          break;
+        }
+        setLiveSynthesis(prev => ({
+          ...prev,
+          [data.call_id]: {
+            text: (prev[data.call_id]?.text || '') + data.delta,
+            done: data.done
+          }
+        }));
+        if (data.done && data.ttft_ms != null) {
+          addLog(`⚡ Report streamed (first token after ${data.ttft_ms} ms)`, 'info');
+        }
+        break;
       case 'research_complete':
         addLog('📞 Research finished!', 'success');
         setIsResearching(false);
         break;
       case 'error':
         addLog(`❌ ${data.message}`, 'error');
+        dropLiveSynthesis(data.call_id);
         setIsResearching(false);
         break;
     }
   };
 
+  const dropLiveSynthesis = (callId) => {
+    // No call_id means we can't tell which run failed - close every live panel
+    setLiveSynthesis(prev => {
+      if (callId === undefined || callId === null) return {};
+      const { [callId]: _dropped, ...rest } = prev;
+      return rest;
+    });
+  };
+
   const updateNode = (nodeUpdate) => {
     setNodes(prev => {
       const exists = prev.find(n => n.id === nodeUpdate.id);
@@ -689,6 +729,10 @@ ${s.url ? `- **URL:** ${s.url}` : ''}
         return 'bg-blue-500/20 border-blue-400 animate-pulse';
       case 'completed':
         return 'bg-green-500/20 border-green-400';
+      case 'failed':
+        return 'bg-red-500/20 border-red-400';
+      case 'skipped':
+        return 'bg-gray-500/20 border-gray-400';
       default:
         return 'bg-purple-500/20 border-purple-400';
     }
@@ -817,7 +861,10 @@ ${s.url ? `- **URL:** ${s.url}` : ''}
                     <div className="flex items-center justify-between mb-2">
                       <span className="text-white font-semibold">{node.label}</span>
                       <span className={`px-3 py-1 rounded-full text-xs font-medium ${
-                        node.status === 'completed' ? 'bg-green-500' : 'bg-blue-500'
+                        node.status === 'completed' ? 'bg-green-500'
+                          : node.status === 'failed' ? 'bg-red-500'
+                          : node.status === 'skipped' ? 'bg-gray-500'
+                          : 'bg-blue-500'
                       } text-white`}>
                         {node.status || 'idle'}
                       </span>
@@ -825,6 +872,11 @@ ${s.url ? `- **URL:** ${s.url}` : ''}
                     {node.query && (
                       <p className="text-purple-200 text-sm">Task: {node.query}</p>
                     )}
+                    {node.facts !== undefined && (
+                      <p className="text-purple-300 text-xs mt-1">
+                        {node.error ? `⚠️ ${node.error}` : `${node.facts} facts`} · {node.elapsedMs} ms
+                      </p>
+                    )}
                   </div>
                 ))
               )}
@@ -854,6 +906,23 @@ ${s.url ? `- **URL:** ${s.url}` : ''}
           </div>
         </div>
 
+        {Object.entries(liveSynthesis).map(([callId, live]) => (
+          <div key={callId} className="mt-6 bg-gradient-to-r from-green-500/20 to-blue-500/20 backdrop-blur-lg rounded-2xl p-6 border-2 border-green-400/50">
+            <h2 className="text-2xl font-bold text-white mb-4 flex items-center gap-2">
+              {live.done
+                ? <CheckCircle className="w-7 h-7 text-green-400" />
+                : <Loader2 className="w-7 h-7 text-green-400 animate-spin" />}
+              {live.done ? 'Report Written' : 'Writing Report...'}
+              {Object.keys(liveSynthesis).length > 1 && (
+                <span className="text-sm font-normal text-green-200">({callId})</span>
+              )}
+            </h2>
+            <div className="bg-black/20 rounded-xl p-5 text-white leading-relaxed whitespace-pre-wrap max-h-96 overflow-y-auto">
+              {live.text}
+            </div>
+          </div>
+        ))}
+
         {results && (
           <div className="mt-6 space-y-6">
             <div className="bg-gradient-to-r from-blue-500/20 to-purple-500/20 backdrop-blur-lg rounded-2xl p-6 border-2 border-blue-400/50">